@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 import json
-import requests
+from retry import RetryPolicy, post_signed
+from reply import Reply
 import uuid
 from datetime import datetime, timezone
-from creds import SETTLE_ENDPOINT, get_headers, COLLECTOR_APP_ID, RECEIVER_APP_ID, BAP_ID, BAP_URI, BPP_ID, BPP_URI,PRIVATE_KEY,SUBSCRIBER_ID
+from creds import SETTLE_ENDPOINT, COLLECTOR_APP_ID, RECEIVER_APP_ID, BAP_ID, BAP_URI, BPP_ID, BPP_URI,PRIVATE_KEY,SUBSCRIBER_ID
 
 def test_nocs_api():
     print("TC_01: Missing settlement type")
@@ -35,12 +36,11 @@ def test_nocs_api():
     }
     
     request_body = json.dumps(payload, separators=(',', ':'))
-    headers = get_headers(SUBSCRIBER_ID,request_body,PRIVATE_KEY)
     
     try:
-        response = requests.post(SETTLE_ENDPOINT, headers=headers, data=request_body, timeout=30)
+        response = post_signed(SETTLE_ENDPOINT, request_body, SUBSCRIBER_ID, PRIVATE_KEY, RetryPolicy())
         print(f"Status: {response.status_code} | Txn: {transaction_id} | Msg: {message_id} | timestamp: {payload['context']['timestamp']}")
-        print(f"Response: {json.dumps(response.json(), separators=(',', ':'))}")
+        Reply(response).log()
     except Exception as e:
         print(f"Error: {e}")
 
@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 import json
 import uuid
-import requests
+from retry import RetryPolicy, post_with_retry
+from reply import Reply
 import base64
 import datetime
 import nacl.encoding
@@ -89,15 +90,10 @@ def test_nocs_api():
     
     # Make the API call
     try:
-        response = requests.post(
-            SETTLE_ENDPOINT,
-            headers=headers,
-            data=request_body_raw_text,
-            timeout=30
-        )
+        response = post_with_retry(SETTLE_ENDPOINT, request_body_raw_text, headers, RetryPolicy())
         
         print(f"Status: {response.status_code} | Txn: {transaction_id} | Msg: {message_id} | timestamp: {payload['context']['timestamp']}")
-        print(f"Response: {json.dumps(response.json(), separators=(',', ':'))}")
+        Reply(response).log()
             
     except Exception as e:
         print(f"Error: {e}")
@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 import json
 import uuid
-import requests
+from retry import RetryPolicy, post_with_retry
+from reply import Reply
 from datetime import datetime, timezone
 # Import from nocs_config
 from creds import SETTLE_ENDPOINT, BAP_ID, BAP_URI, BPP_ID, BPP_URI, COLLECTOR_APP_ID, RECEIVER_APP_ID
@@ -52,15 +53,10 @@ def test_nocs_api():
     
     # Make the API call
     try:
-        response = requests.post(
-            SETTLE_ENDPOINT,
-            headers=headers,
-            data=request_body_raw_text,
-            timeout=30
-        )
+        response = post_with_retry(SETTLE_ENDPOINT, request_body_raw_text, headers, RetryPolicy())
 
         print(f"Status: {response.status_code} | Txn: {transaction_id} | Msg: {message_id} | timestamp: {payload['context']['timestamp']}")
-        print(f"Response: {json.dumps(response.json(), separators=(',', ':'))}")
+        Reply(response).log()
             
     except Exception as e:
         print(f"Error: {e}")
@@ -1,11 +1,12 @@
 #!/usr/bin/env python3
 import json
-import requests
+from retry import RetryPolicy, post_signed
+from reply import Reply
 import time
 import uuid
 from datetime import datetime, timezone
 # Import from creds
-from creds import SETTLE_ENDPOINT, get_headers, COLLECTOR_APP_ID, RECEIVER_APP_ID, BAP_ID, BAP_URI, BPP_ID, BPP_URI,PRIVATE_KEY,BUYER_KEY
+from creds import SETTLE_ENDPOINT, COLLECTOR_APP_ID, RECEIVER_APP_ID, BAP_ID, BAP_URI, BPP_ID, BPP_URI,PRIVATE_KEY,BUYER_KEY
 
 unique_id = str(uuid.uuid4())[:8]
 transaction_id = f"tc04-txn-{unique_id}"
@@ -82,18 +83,12 @@ def test_first_settlement():
     # print(f"Payload1: {json.dumps(payload1, separators=(',', ':'))}")
     # Send first settlement
     request_body_raw_text = json.dumps(payload1, separators=(',', ':'))
-    headers = get_headers(BAP_ID,request_body_raw_text,PRIVATE_KEY)
     
     try:
-        response = requests.post(
-            SETTLE_ENDPOINT,
-            headers=headers,
-            data=request_body_raw_text,
-            timeout=30
-        )
+        response = post_signed(SETTLE_ENDPOINT, request_body_raw_text, BAP_ID, PRIVATE_KEY, RetryPolicy())
         
         print(f"Status: {response.status_code} | Txn: {transaction_id} | Msg: {message_id_1} | timestamp: {payload1['context']['timestamp']}")
-        print(f"Response: {json.dumps(response.json(), separators=(',', ':'))}")
+        Reply(response).log()
         
         if response.status_code == 200:
             print("\n✅ First settlement sent successfully!")
@@ -173,18 +168,12 @@ def test_second_settlement(transaction_id,message_id_2):
     # print(f"Payload2: {json.dumps(payload2, separators=(',', ':'))}")
     # Send second settlement
     request_body_raw_text = json.dumps(payload2, separators=(',', ':'))
-    headers = get_headers(BAP_ID,request_body_raw_text,PRIVATE_KEY)
     
     try:
-        response = requests.post(
-            SETTLE_ENDPOINT,
-            headers=headers,
-            data=request_body_raw_text,
-            timeout=30
-        )
+        response = post_signed(SETTLE_ENDPOINT, request_body_raw_text, BAP_ID, PRIVATE_KEY, RetryPolicy())
         
         print(f"Status: {response.status_code} | Txn: {transaction_id} | Msg: {message_id_2} | timestamp: {payload2['context']['timestamp']}")
-        print(f"Response: {json.dumps(response.json(), separators=(',', ':'))}")
+        Reply(response).log()
         
         if response.status_code == 200:
             print("\n✅ Second settlement sent successfully!")
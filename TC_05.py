@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
 import json
-import requests
+from retry import RetryPolicy, post_signed
+from reply import Reply
 import time
 import uuid
 from datetime import datetime, timezone
-from creds import SETTLE_ENDPOINT, get_headers, COLLECTOR_APP_ID, RECEIVER_APP_ID, BAP_ID, BAP_URI, BPP_ID, BPP_URI,PRIVATE_KEY,SUBSCRIBER_ID
+from creds import SETTLE_ENDPOINT, COLLECTOR_APP_ID, RECEIVER_APP_ID, BAP_ID, BAP_URI, BPP_ID, BPP_URI,PRIVATE_KEY,SUBSCRIBER_ID
 
 unique_id = str(uuid.uuid4())[:8]
 transaction_id_1 = f"tc05-txn-{unique_id}-1"
@@ -56,12 +57,11 @@ def test_nocs_api():
     }
     
     request_body = json.dumps(payload1, separators=(',', ':'))
-    headers = get_headers(SUBSCRIBER_ID,request_body,PRIVATE_KEY)
     
     try:
-        response = requests.post(SETTLE_ENDPOINT, headers=headers, data=request_body, timeout=30)
+        response = post_signed(SETTLE_ENDPOINT, request_body, SUBSCRIBER_ID, PRIVATE_KEY, RetryPolicy())
         print(f"Status: {response.status_code} | Txn: {transaction_id_1} | Msg: {message_id} | timestamp: {payload1['context']['timestamp']}")
-        print(f"Response: {json.dumps(response.json(), separators=(',', ':'))}")
+        Reply(response).log()
         
         time.sleep(2)
         print("\n--- Waiting 2 seconds ---\n")
@@ -107,11 +107,10 @@ def test_nocs_api():
         }
         
         request_body2 = json.dumps(payload2, separators=(',', ':'))
-        headers2 = get_headers(SUBSCRIBER_ID,request_body2,PRIVATE_KEY)
         
-        response2 = requests.post(SETTLE_ENDPOINT, headers=headers2, data=request_body2, timeout=30)
+        response2 = post_signed(SETTLE_ENDPOINT, request_body2, SUBSCRIBER_ID, PRIVATE_KEY, RetryPolicy())
         print(f"Status: {response2.status_code} | Txn: {transaction_id_2} | Msg: {message_id} | timestamp: {payload2['context']['timestamp']}")
-        print(f"Response: {json.dumps(response2.json(), separators=(',', ':'))}")
+        Reply(response2).log()
         
         # Check for expected error
         if response2.status_code == 200:
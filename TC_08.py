@@ -1,12 +1,13 @@
 #!/usr/bin/env python3
 import json
-import requests
+from retry import RetryPolicy, post_signed
+from reply import Reply
 import time
 import uuid
 from datetime import datetime, timezone
 
 # Import from nocs_config
-from creds import SETTLE_ENDPOINT, get_headers, COLLECTOR_APP_ID, RECEIVER_APP_ID, BAP_ID, BAP_URI, BPP_ID, BPP_URI,BUYER_KEY,PRIVATE_KEY
+from creds import SETTLE_ENDPOINT, COLLECTOR_APP_ID, RECEIVER_APP_ID, BAP_ID, BAP_URI, BPP_ID, BPP_URI,BUYER_KEY,PRIVATE_KEY
 
 unique_id = str(uuid.uuid4())[:8]
 transaction_id_1 = f"tc08-txn-{unique_id}"
@@ -84,25 +85,14 @@ def test_collector_settlement():
     # print(f"Payload1: {json.dumps(collector_payload, separators=(',', ':'))}")
     # Send collector settlement
     request_body_raw_text = json.dumps(collector_payload, separators=(',', ':'))
-    headers = get_headers(COLLECTOR_APP_ID,request_body_raw_text,PRIVATE_KEY)
     
     try:
-        response = requests.post(
-            SETTLE_ENDPOINT,
-            headers=headers,
-            data=request_body_raw_text,
-            timeout=30
-        )
+        response = post_signed(SETTLE_ENDPOINT, request_body_raw_text, COLLECTOR_APP_ID, PRIVATE_KEY, RetryPolicy())
         
         print(f"Status: {response.status_code} | Txn: {transaction_id_1} | Msg: {message_id_1} | timestamp: {collector_payload['context']['timestamp']}")
         
-        # Handle response safely
-        try:
-            response_json = response.json()
-            print(f"Response: {json.dumps(response_json, separators=(',', ':'))}")
-        except json.JSONDecodeError:
-            print(f"Response text: {response.text}")
-            print("Note: Response is not valid JSON (this might be expected for some endpoints)")
+        # Raw body as received, JSON or not
+        Reply(response).log()
         
         if response.status_code == 200:
             print("\n✅ Collector settlement successful!")
@@ -185,25 +175,14 @@ def test_receiver_settlement(transaction_id_2, message_id_2):
     # print(f"Payload2: {json.dumps(receiver_payload, separators=(',', ':'))}")
     # Send receiver settlement
     request_body_raw_text = json.dumps(receiver_payload, separators=(',', ':'))
-    headers = get_headers(RECEIVER_APP_ID,request_body_raw_text,BUYER_KEY)
     
     try:
-        response = requests.post(
-            SETTLE_ENDPOINT,
-            headers=headers,
-            data=request_body_raw_text,
-            timeout=30
-        )
+        response = post_signed(SETTLE_ENDPOINT, request_body_raw_text, RECEIVER_APP_ID, BUYER_KEY, RetryPolicy())
         
         print(f"Status: {response.status_code} | Txn: {transaction_id_2} | Msg: {message_id_2} | timestamp: {receiver_payload['context']['timestamp']}")
         
-        # Handle response safely
-        try:
-            response_json = response.json()
-            print(f"Response: {json.dumps(response_json, separators=(',', ':'))}")
-        except json.JSONDecodeError:
-            print(f"Response text: {response.text}")
-            print("Note: Response is not valid JSON (this might be expected for some endpoints)")
+        # Raw body as received, JSON or not
+        Reply(response).log()
         
         if response.status_code == 200:
             print("\n✅ Receiver settlement successful!")
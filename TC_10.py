@@ -1,11 +1,12 @@
 #!/usr/bin/env python3
 import json
-import requests
+from retry import RetryPolicy, post_signed
+from reply import Reply
 import time
 import uuid
 from datetime import datetime, timezone
 # Import from nocs_config
-from creds import SETTLE_ENDPOINT, get_headers, COLLECTOR_APP_ID, RECEIVER_APP_ID, BAP_ID, BAP_URI, BPP_ID, BPP_URI,PRIVATE_KEY,BUYER_KEY
+from creds import SETTLE_ENDPOINT, COLLECTOR_APP_ID, RECEIVER_APP_ID, BAP_ID, BAP_URI, BPP_ID, BPP_URI,PRIVATE_KEY,BUYER_KEY
 
 unique_id = str(uuid.uuid4())[:8]
 transaction_id_1 = f"tc10-txn-{unique_id}"
@@ -80,18 +81,12 @@ def test_collector_settlement():
     
     # Send collector settlement
     request_body_raw_text = json.dumps(collector_payload, separators=(',', ':'))
-    headers = get_headers(BAP_ID,request_body_raw_text,PRIVATE_KEY)
     
     try:
-        response = requests.post(
-            SETTLE_ENDPOINT,
-            headers=headers,
-            data=request_body_raw_text,
-            timeout=30
-        )
+        response = post_signed(SETTLE_ENDPOINT, request_body_raw_text, BAP_ID, PRIVATE_KEY, RetryPolicy())
         
         print(f"Status: {response.status_code} | Txn: {transaction_id_1} | Msg: {message_id_1} | timestamp: {collector_payload['context']['timestamp']}")
-        print(f"Response: {json.dumps(response.json(), separators=(',', ':'))}")
+        Reply(response).log()
         
         if response.status_code == 200:
             print("\n✅ Collector settlement got ACK!")  
@@ -169,18 +164,12 @@ def test_receiver_settlement(transaction_id_2, message_id_2):
     
     # Send receiver settlement
     request_body_raw_text = json.dumps(receiver_payload, separators=(',', ':'))
-    headers = get_headers(RECEIVER_APP_ID,request_body_raw_text,BUYER_KEY)
     
     try:
-        response = requests.post(
-            SETTLE_ENDPOINT,
-            headers=headers,
-            data=request_body_raw_text,
-            timeout=30
-        )
+        response = post_signed(SETTLE_ENDPOINT, request_body_raw_text, RECEIVER_APP_ID, BUYER_KEY, RetryPolicy())
         
         print(f"Status: {response.status_code} | Txn: {transaction_id_2} | Msg: {message_id_2} | timestamp: {receiver_payload['context']['timestamp']}")
-        print(f"Response: {json.dumps(response.json(), separators=(',', ':'))}")
+        Reply(response).log()
         
         if response.status_code == 200:
             print("\n✅ Receiver settlement got ACK!")
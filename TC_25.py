@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
 import json
-import requests
+from retry import RetryPolicy, post_signed
+from reply import Reply
 import uuid
 from datetime import datetime, timezone
 # Import from nocs_config
-from creds import get_headers, COLLECTOR_APP_ID, RECEIVER_APP_ID, BAP_ID, BAP_URI, BPP_ID, BPP_URI, REPORT_ENDPOINT,PRIVATE_KEY
+from creds import COLLECTOR_APP_ID, RECEIVER_APP_ID, BAP_ID, BAP_URI, BPP_ID, BPP_URI, REPORT_ENDPOINT,PRIVATE_KEY
 
 
 def test_report_with_invalid_refs():
@@ -37,18 +38,12 @@ def test_report_with_invalid_refs():
     }
     
     request_body_raw_text = json.dumps(report_payload, separators=(',', ':'))
-    headers = get_headers(BAP_ID,request_body_raw_text,PRIVATE_KEY)
     
     try:
-        response = requests.post(
-            REPORT_ENDPOINT,
-            headers=headers,
-            data=request_body_raw_text,
-            timeout=30
-        )
+        response = post_signed(REPORT_ENDPOINT, request_body_raw_text, BAP_ID, PRIVATE_KEY, RetryPolicy())
         
         print(f"Report Status: {response.status_code} | Txn: {report_transaction_id} | Msg: {report_message_id} | timestamp: {report_payload['context']['timestamp']}")
-        print(f"Report Response: {json.dumps(response.json(), separators=(',', ':'))}")
+        Reply(response).log("Report Response: ")
         
         if response.status_code == 200:
             print("\n✅ Report request got ACK successful!")
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""asyncio client for /nocs/v2/settle and /nocs/v2/report.
+
+Requests are signed with the `creds` HeaderFactory and sent through a pooled
+Transport on a worker pool no larger than the in-flight limit, so thousands of
+settlements can be queued without thousands of threads.
+"""
+import asyncio
+import time
+import uuid
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from body import Body
+from creds import BPP_ID, BPP_URI, REPORT_ENDPOINT, SETTLE_ENDPOINT, config, header_factory
+from reply import Reply
+from retry import send_with_retry
+from transport import Transport, config_breakers
+
+Result = namedtuple("Result", "index payload response error")
+
+def timestamp():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+def context(action, transaction_id, message_id):
+    return {
+        "domain": "ONDC:NTS10",
+        "location": {"country": {"code": "IND"}, "city": {"code": "*"}},
+        "version": "2.0.0",
+        "action": action,
+        "bap_id": config.BAP_ID,
+        "bap_uri": config.BAP_URI,
+        "bpp_id": BPP_ID,
+        "bpp_uri": BPP_URI,
+        "transaction_id": transaction_id,
+        "message_id": message_id,
+        "timestamp": timestamp(),
+        "ttl": "P1D"
+    }
+
+def report_payload(ref_transaction_id, ref_message_id):
+    unique_id = str(uuid.uuid4())[:8]
+    return {
+        "context": context("report", f"report-txn-{unique_id}", f"report-msg-{unique_id}"),
+        "message": {
+            "ref_transaction_id": ref_transaction_id,
+            "ref_message_id": ref_message_id
+        }
+    }
+
+def hedge_payload(payload):
+    """Copy of a report payload with a new message_id and timestamp, for a hedged resend."""
+    unique_id = str(uuid.uuid4())[:8]
+    return dict(payload, context=dict(payload["context"], message_id=f"report-msg-{unique_id}", timestamp=timestamp()))
+
+def _succeeded(task):
+    # Also marks a failed task's exception as retrieved; hedge losers are never awaited
+    return not task.cancelled() and task.exception() is None
+
+class AsyncNocsClient:
+    def __init__(self, factory=None, max_in_flight=32, transport=None, timeout=30,
+                 settle_url=SETTLE_ENDPOINT, report_url=REPORT_ENDPOINT, limiter=None, retry=None,
+                 hedge=None):
+        """Pass an AIMDLimiter as `limiter` to adapt the in-flight cap instead of fixing it,
+        a RetryPolicy as `retry` to re-sign and resend failed calls, and a HedgePolicy as
+        `hedge` to race slow reports against a second copy."""
+        self.retry = retry
+        self.hedge = hedge
+        self.settle_url = settle_url
+        self.report_url = report_url
+        self.factory = factory or header_factory(config.SUBSCRIBER_ID, config.PRIVATE_KEY)
+        self.limiter = limiter
+        if limiter is not None:
+            max_in_flight = limiter.maximum
+        self.max_in_flight = max_in_flight
+        self.transport = transport or Transport(pool_size=max_in_flight, breakers=config_breakers())
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="nocs")
+        self._slots = None
+
+    def _send(self, url, payload):
+        body = getattr(payload, "body", None)  # chunker.Chunk: already serialized and hashed
+        if body is None:
+            body = Body.from_payload(payload)
+        if self.retry is not None:
+            return send_with_retry(url, body, self.factory, self.retry, self.transport)
+        headers = self.factory.headers(body.data, digest=body.digest)
+        return self.transport.post(url, data=body.data, headers=headers, timeout=self.timeout)
+
+    async def post(self, url, payload):
+        loop = asyncio.get_running_loop()
+        if self.limiter is not None:
+            return await self._post_limited(loop, url, payload)
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+        async with self._slots:
+            return await loop.run_in_executor(self._executor, self._send, url, payload)
+
+    async def _post_limited(self, loop, url, payload):
+        async with self.limiter.slot():
+            start = time.perf_counter()
+            try:
+                response = await loop.run_in_executor(self._executor, self._send, url, payload)
+            except Exception:
+                self.limiter.record(time.perf_counter() - start)
+                raise
+            # a 200 can still carry a NACK; the limiter holds back while the ACK rate is low
+            self.limiter.record(time.perf_counter() - start, response.status_code, ack=Reply(response).acked)
+            return response
+
+    async def settle(self, payload):
+        return await self.post(self.settle_url, payload)
+
+    async def report(self, ref_transaction_id, ref_message_id):
+        payload = report_payload(ref_transaction_id, ref_message_id)
+        if self.hedge is None:
+            return await self.post(self.report_url, payload)
+        return await self._hedged(self.report_url, payload)
+
+    async def _hedged(self, url, payload):
+        hedge = self.hedge
+        hedge.counts["reports"] += 1
+        start = time.perf_counter()
+
+        def primary_done(task):
+            # only successful replies feed the latency percentile; errors and cancels would skew it
+            if _succeeded(task):
+                hedge.record(time.perf_counter() - start)
+
+        primary = asyncio.ensure_future(self.post(url, payload))
+        primary.add_done_callback(primary_done)
+        done, _ = await asyncio.wait({primary}, timeout=hedge.delay())
+        if done or not hedge.allow():
+            return await primary
+        hedge.counts["hedged"] += 1
+        second = asyncio.ensure_future(self.post(url, hedge_payload(payload)))
+        second.add_done_callback(_succeeded)
+        # The first successful reply wins; the loser runs to completion in the background
+        pending = {primary, second}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            succeeded = [task for task in (primary, second) if task in done and _succeeded(task)]
+            if succeeded:
+                winner = succeeded[0]
+                break
+        else:
+            return primary.result()  # both failed: raise the primary's error
+        if winner is second:
+            hedge.counts["hedge_won"] += 1
+            if not primary.done():
+                won_at = time.perf_counter()
+
+                def saved(task):
+                    if _succeeded(task):
+                        hedge.saved += time.perf_counter() - won_at
+
+                primary.add_done_callback(saved)
+        return winner.result()
+
+    async def _result(self, index, payload, call):
+        try:
+            return Result(index, payload, await call(payload), None)
+        except Exception as e:
+            return Result(index, payload, None, e)
+
+    async def _stream(self, payloads, call):
+        tasks = [asyncio.ensure_future(self._result(i, payload, call)) for i, payload in enumerate(payloads)]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def settle_many(self, payloads):
+        """Async iterator of Result(index, payload, response, error) in completion order."""
+        return self._stream(payloads, self.settle)
+
+    async def settle_stream(self, payloads):
+        """Like settle_many, but takes payloads from the iterable only as requests finish, at most
+        max_in_flight ahead, so a generator such as SettlementChunker.chunks() builds each one just
+        before it is sent."""
+        pending = set()
+        try:
+            for index, payload in enumerate(payloads):
+                pending.add(asyncio.ensure_future(self._result(index, payload, self.settle)))
+                if len(pending) >= self.max_in_flight:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def report_many(self, refs):
+        """Like settle_many for (ref_transaction_id, ref_message_id) pairs."""
+        return self._stream(refs, lambda ref: self.report(*ref))
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.transport.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
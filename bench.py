@@ -0,0 +1,528 @@
+#!/usr/bin/env python3
+"""Client-side micro-benchmarks for the NOCS signing path.
+
+Usage: python bench.py [headers] [batch] [hash] [sign] [verify] [body] [keyring] [importtime] [aimd] [http2] [hedge] [breaker] [reply] [resume] [warmup] [model] [context] [bulk] [amounts] [chunks]
+"""
+import asyncio
+import glob
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+
+import creds
+from body import Body
+from key_ring import COLLECTOR, RECEIVER, KeyRing
+from payload import Amount, BankDetails, Context, ContextTemplate, Order, Party, SettlePayload, Settlement
+from creds import BUYER_KEY, RECEIVER_APP_ID, get_headers, get_headers_batch
+
+def sample_body():
+    payload = {
+        "context": {
+            "domain": "ONDC:NTS10",
+            "action": "settle",
+            "transaction_id": f"bench-txn-{uuid.uuid4()}",
+            "message_id": f"bench-msg-{uuid.uuid4()}",
+            "ttl": "P1D"
+        },
+        "message": {
+            "collector_app_id": "bench-collector.example.com",
+            "receiver_app_id": RECEIVER_APP_ID,
+            "settlement": {"type": "NIL"}
+        }
+    }
+    return json.dumps(payload, separators=(',', ':'))
+
+def rate(fn, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        fn()
+    return count / (time.perf_counter() - start)
+
+def bench_headers(count=2000):
+    body = sample_body()
+
+    def uncached():
+        creds.clear_signers()
+        get_headers(RECEIVER_APP_ID, body, BUYER_KEY)
+
+    def cached():
+        get_headers(RECEIVER_APP_ID, body, BUYER_KEY)
+
+    factory = creds.HeaderFactory(RECEIVER_APP_ID, BUYER_KEY, clock=lambda: 1700000000)
+
+    before = rate(uncached, count)
+    after = rate(cached, count)
+    fixed = rate(lambda: factory.headers(body), count)
+    print(f"get_headers uncached signer: {before:,.0f} headers/s")
+    print(f"get_headers cached signer:   {after:,.0f} headers/s ({after / before:.2f}x)")
+    print(f"HeaderFactory fixed clock:   {fixed:,.0f} headers/s ({fixed / before:.2f}x)")
+
+def bench_batch(count=20000):
+    bodies = [sample_body() for _ in range(count)]
+    for workers in (1, None):
+        start = time.perf_counter()
+        headers = get_headers_batch(bodies, BUYER_KEY, RECEIVER_APP_ID, workers=workers)
+        elapsed = time.perf_counter() - start
+        label = workers or "all cores"
+        print(f"get_headers_batch workers={label}: {len(headers) / elapsed:,.0f} headers/s")
+
+def large_body(orders=2000):
+    order = {
+        "id": "order-bench",
+        "inter_participant": {"amount": {"currency": "INR", "value": "1000.00"}},
+        "collector": {"amount": {"currency": "INR", "value": "50.00"}},
+        "provider": {
+            "id": "prvdr-bench",
+            "name": "Test Provider 1",
+            "bank_details": {"account_no": "1234567890", "ifsc_code": "IFSC0001"},
+            "amount": {"currency": "INR", "value": "800.00"}
+        },
+        "self": {"amount": {"currency": "INR", "value": "200.00"}}
+    }
+    payload = json.loads(sample_body())
+    payload["message"]["settlement"] = {"type": "NP-NP", "id": "settlement-bench", "orders": [order] * orders}
+    return json.dumps(payload, separators=(',', ':'))
+
+def bench_hash(count=200):
+    body = large_body().encode('utf-8')
+    broken = creds.check_hash_backends(creds.HASH_SAMPLES + [body, body[:-1], body[:4096]])
+    if broken:
+        sys.exit(f"hash backends disagree with PyNaCl: {', '.join(broken)}")
+    print(f"cross-check OK, selected backend: {creds.select_hash_backend()}")
+    megabytes = len(body) / 1e6
+    for name, hasher in creds.HASH_BACKENDS.items():
+        print(f"{name:8} {rate(lambda: hasher(body), count) * megabytes:,.0f} MB/s")
+
+def bench_sign(count=5000):
+    broken = creds.check_sign_backends()
+    if broken:
+        sys.exit(f"signing backends fail the golden vectors: {', '.join(broken)}")
+    selected = creds.select_sign_backend()
+    print(f"golden vectors OK, selected backend: {selected}")
+    body = sample_body()
+    for name in creds.SIGN_BACKENDS:
+        creds.select_sign_backend(name)
+        print(f"{name:13} {rate(lambda: get_headers(RECEIVER_APP_ID, body, BUYER_KEY), count):,.0f} headers/s")
+    creds.select_sign_backend(selected)
+
+def bench_verify(count=5000):
+    body = sample_body()
+    header = creds.create_authorisation_header(RECEIVER_APP_ID, body, BUYER_KEY)
+    expired = creds.create_authorisation_header(RECEIVER_APP_ID, body, BUYER_KEY, created=1, expires=2)
+
+    def reject_expired():
+        try:
+            creds.verify_authorisation_header(expired, body)
+        except creds.SignatureError:
+            pass
+
+    print(f"valid header:   {rate(lambda: creds.verify_authorisation_header(header, body), count):,.0f} verifies/s")
+    print(f"expired header: {rate(reject_expired, count):,.0f} rejects/s")
+
+def bench_body(count=50):
+    payload = json.loads(large_body(orders=5000))
+    body = Body.from_payload(payload)
+    assert body.data == json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    chunks = json.JSONEncoder(separators=(',', ':')).iterencode(payload)
+    assert Body.from_chunks(chunks).digest == body.digest == creds.hash_message(body.data)
+
+    def str_pipeline():
+        text = json.dumps(payload, separators=(',', ':'))
+        creds.hash_message(text)
+        text.encode('utf-8')  # what requests does with data=str
+
+    print(f"dumps + hash(str) + encode: {rate(str_pipeline, count):,.1f} bodies/s")
+    print(f"Body.from_payload:          {rate(lambda: Body.from_payload(payload).digest, count):,.1f} bodies/s")
+
+def bench_keyring(count=500):
+    start = time.perf_counter()
+    ring = KeyRing.default()
+    ring.generate(count, COLLECTOR)
+    ring.generate(count, RECEIVER)
+    print(f"generated {2 * count} identities in {time.perf_counter() - start:.3f}s")
+    body = sample_body()
+    start = time.perf_counter()
+    for collector, receiver in ring.pairs():
+        for identity in (collector, receiver):
+            header = ring.headers(identity.app_id, body)["Authorization"]
+            creds.verify_authorisation_header(header, body)
+    print(f"signed and verified {2 * len(ring.pairs())} headers in {time.perf_counter() - start:.3f}s")
+
+# Modules whose cumulative import cost is broken out per script
+IMPORT_WATCH = ("creds", "requests", "nacl", "dotenv")
+
+def import_times(module):
+    """Cumulative microseconds per module, from `python -X importtime -c 'import <module>'`."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+def startup_time(module, runs=5):
+    """Median wall-clock milliseconds for a fresh interpreter to import `module`, interpreter start included."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    elapsed = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", f"import {module}"], capture_output=True, cwd=here)
+        elapsed.append(time.perf_counter() - start)
+    return sorted(elapsed)[runs // 2] * 1000
+
+def bench_importtime():
+    """Start-up cost of each scenario script. The scripts import settings by name from creds, which
+    loads .env (dotenv) during the import, so creds and its configuration are reported together."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    scripts = sorted(os.path.basename(path)[:-3] for path in glob.glob(os.path.join(here, "TC_*.py")))
+    print(f"bare interpreter: {startup_time('sys'):.1f} ms wall")
+    print(f"{'script':8} {'wall ms':>8} {'import ms':>10} {'creds+.env':>11} "
+          + " ".join(f"{name + ' ms':>12}" for name in IMPORT_WATCH))
+    for script in scripts:
+        times = import_times(script)
+        total = times.get(script, 0) / 1000
+        config = (times.get("creds", 0) + times.get("dotenv", 0)) / 1000
+        watched = " ".join(f"{times.get(name, 0) / 1000:12.1f}" for name in IMPORT_WATCH)
+        print(f"{script:8} {startup_time(script):8.1f} {total:10.1f} {config:11.1f} {watched}")
+
+def settle_payloads(count):
+    return [json.loads(sample_body()) for _ in range(count)]
+
+async def drain(client, payloads):
+    start = time.perf_counter()
+    statuses = {}
+    async for result in client.settle_many(payloads):
+        key = result.response.status_code if result.error is None else type(result.error).__name__
+        statuses[key] = statuses.get(key, 0) + 1
+    return time.perf_counter() - start, statuses
+
+def bench_aimd(count=2000):
+    from async_client import AsyncNocsClient
+    from concurrency import AIMDLimiter
+    from standin import StandInGateway
+    factory = creds.header_factory(RECEIVER_APP_ID, BUYER_KEY)
+    payloads = settle_payloads(count)
+    for label, kwargs in (("fixed 4", {"max_in_flight": 4}),
+                          ("fixed 128", {"max_in_flight": 128}),
+                          ("aimd", {"limiter": AIMDLimiter(initial=4, maximum=128)})):
+        with StandInGateway(capacity=16, service_time=0.01, queue=8, verify=True) as gateway:
+            client = AsyncNocsClient(factory, settle_url=gateway.url + "/nocs/v2/settle", **kwargs)
+            elapsed, statuses = asyncio.run(drain(client, payloads))
+            client.close()
+        print(f"{label:10} {count / elapsed:7,.0f} req/s  statuses={statuses}  gateway={gateway.stats}")
+        if "limiter" in kwargs:
+            print(f"{'':10} limiter={kwargs['limiter'].metrics()}")
+
+def bench_http2(count=2000):
+    from async_client import AsyncNocsClient
+    from standin import StandInGateway, self_signed_context
+    from transport import Http2Transport, Transport
+    factory = creds.header_factory(RECEIVER_APP_ID, BUYER_KEY)
+    payloads = settle_payloads(count)
+    for label, http2, transport_class in (("http/1.1", True, Transport),
+                                          ("h2", True, Http2Transport),
+                                          ("h2 offer", False, Http2Transport)):  # server without h2: ALPN fallback
+        context, ca = self_signed_context(http2=http2)
+        with StandInGateway(capacity=64, service_time=0.005, queue=count, ssl_context=context) as gateway:
+            client = AsyncNocsClient(factory, max_in_flight=32, transport=transport_class(pool_size=32, verify=ca),
+                                     settle_url=gateway.url + "/nocs/v2/settle")
+            elapsed, statuses = asyncio.run(drain(client, payloads))
+            client.close()
+        print(f"{label:10} {count / elapsed:7,.0f} req/s  statuses={statuses}  "
+              f"connections={gateway.stats['connections']}  h2={gateway.stats['h2_connections']}")
+
+async def report_latencies(client, refs, workers=16):
+    latencies = []
+    refs = iter(refs)
+
+    async def worker():
+        for ref in refs:
+            start = time.perf_counter()
+            await client.report(*ref)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    return sorted(latencies)
+
+def bench_hedge(count=2000):
+    from async_client import AsyncNocsClient
+    from hedge import HedgePolicy
+    from standin import StandInGateway
+    factory = creds.header_factory(RECEIVER_APP_ID, BUYER_KEY)
+    refs = [(f"bench-txn-{i}", f"bench-msg-{i}") for i in range(count)]
+    for label, hedge in (("plain", None), ("hedged p95", HedgePolicy(percentile=0.95))):
+        with StandInGateway(capacity=64, service_time=0.005, slow_rate=0.02, slow_time=0.25, seed=1) as gateway:
+            client = AsyncNocsClient(factory, max_in_flight=64, report_url=gateway.url + "/nocs/v2/report", hedge=hedge)
+            latencies = asyncio.run(report_latencies(client, refs))
+            client.close()
+        p50, p99 = (latencies[int(q * len(latencies))] * 1000 for q in (0.5, 0.99))
+        print(f"{label:10} p50 {p50:6.1f} ms  p99 {p99:6.1f} ms  max {latencies[-1] * 1000:6.1f} ms  "
+              f"gateway requests={gateway.stats['requests']}")
+        if hedge is not None:
+            print(f"{'':10} hedge={hedge.metrics()}")
+
+def bench_breaker(count=200):
+    import socket
+    from async_client import AsyncNocsClient
+    with socket.socket() as sock:  # a port nothing listens on: every connect is refused
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    factory = creds.header_factory(RECEIVER_APP_ID, BUYER_KEY)
+    client = AsyncNocsClient(factory, max_in_flight=8, settle_url=f"http://127.0.0.1:{port}/nocs/v2/settle")
+    breakers = client.transport.breakers
+    if breakers is None:
+        sys.exit("BREAKER_FAILURES=0: the default async transport has no breakers")
+    elapsed, statuses = asyncio.run(drain(client, settle_payloads(count)))
+    client.close()
+    print(f"dead host: {count} settles in {elapsed:.3f} s  outcomes={statuses}  circuits={breakers.states()}")
+    if not statuses.get("CircuitOpenError"):
+        sys.exit("the breaker never opened against a dead host")
+
+def bench_reply(count=100000):
+    import requests
+    from reply import Reply
+    from standin import nack
+    response = requests.models.Response()
+    response.status_code = 401
+    response._content = nack("70000", "Invalid Signature (bad-signature)")
+    with open(os.devnull, "w") as out:
+        parse_dump = rate(lambda: print(f"Response: {json.dumps(response.json(), separators=(',', ':'))}",
+                                        file=out), count)
+        raw = rate(lambda: Reply(response).log(stream=out), count)
+
+        def log_and_read():
+            reply = Reply(response)
+            reply.log(stream=out)
+            return reply.ack_status, reply.error_code
+
+        raw_fields = rate(log_and_read, count)
+    print(f"json()+dumps+print  {parse_dump:10,.0f} replies/s")
+    print(f"Reply.log           {raw:10,.0f} replies/s")
+    print(f"Reply.log+2 fields  {raw_fields:10,.0f} replies/s")
+
+def bench_resume(count=200):
+    import timing
+    from standin import StandInGateway, self_signed_context
+    from transport import Transport
+    context, ca = self_signed_context()
+    body = sample_body().encode('utf-8')
+    # keep_alive=False forces a new connection per request, so every call pays for DNS and TLS
+    for label, dns_ttl, tls_resume in (("uncached", 0, False), ("cached", 60, True)):
+        timing.clear()
+        with StandInGateway(capacity=4, service_time=0, ssl_context=context) as gateway:
+            url = gateway.url.replace("127.0.0.1", "localhost") + "/nocs/v2/settle"
+            transport = Transport(keep_alive=False, timings=True, verify=ca, dns_ttl=dns_ttl, tls_resume=tls_resume)
+            for _ in range(count):
+                transport.post(url, data=body, headers={}, scenario=label)
+            transport.close()
+        stats = timing.summary()[(label, "/nocs/v2/settle")]
+        print(f"{label:9} dns {stats['dns'][0] * 1000:6.2f} ms  tls {stats['tls'][0] * 1000:6.2f} ms  "
+              f"total {stats['total'][0] * 1000:6.2f} ms  cached lookups {stats['dns_cached']}/{count}  "
+              f"resumed {stats['resumed']}/{count}")
+
+def bench_warmup(workers=8):
+    from concurrent.futures import ThreadPoolExecutor
+
+    import timing
+    from standin import StandInGateway, self_signed_context
+    from transport import Http2Transport, Transport
+    body = sample_body().encode('utf-8')
+    for label, transport_class, warm_up in (("cold", Transport, 0), ("warm", Transport, workers),
+                                            ("h2 warm", Http2Transport, workers)):
+        timing.clear()
+        context, ca = self_signed_context(http2=transport_class is Http2Transport)
+        with StandInGateway(capacity=workers, service_time=0.01, ssl_context=context) as gateway:
+            url = gateway.url + "/nocs/v2/settle"
+            transport = transport_class(pool_size=workers, timings=True, verify=ca, warm_up=warm_up)
+            with ThreadPoolExecutor(max_workers=workers) as executor:  # concurrent first requests
+                list(executor.map(lambda _: transport.post(url, data=body, headers={}, scenario=label),
+                                  range(workers)))
+            transport.close()
+        stats = timing.summary()[(label, "/nocs/v2/settle")]
+        print(f"{label:8} first {workers} requests: total {stats['total'][0] * 1000:6.2f} ms  "
+              f"tls {stats['tls'][0] * 1000:6.2f} ms  on warmed connections {stats['reused']}/{workers}  "
+              f"gateway requests={gateway.stats['requests']}")
+        if warm_up and stats['reused'] != workers:
+            sys.exit(f"{label}: first requests opened their own connections despite warm-up")
+
+def order_dict(i):
+    return {
+        "id": f"order-bench-{i}",
+        "inter_participant": {"amount": {"currency": "INR", "value": "1000.00"}},
+        "collector": {"amount": {"currency": "INR", "value": "50.00"}},
+        "provider": {
+            "id": f"prvdr-bench-{i}",
+            "name": "Test Provider 1",
+            "bank_details": {"account_no": "1234567890", "ifsc_code": "IFSC0001"},
+            "amount": {"currency": "INR", "value": "800.00"}
+        },
+        "self": {"amount": {"currency": "INR", "value": "200.00"}}
+    }
+
+def order_model(i):
+    return Order(f"order-bench-{i}",
+                 inter_participant=Party(Amount("1000.00")),
+                 collector=Party(Amount("50.00")),
+                 provider=Party(Amount("800.00"), f"prvdr-bench-{i}", "Test Provider 1",
+                                BankDetails("1234567890", "IFSC0001")),
+                 self_party=Party(Amount("200.00")))
+
+def bench_model(orders=20000):
+    import gc
+    import tracemalloc
+    context = Context("settle", "bench-txn", "bench-msg")
+
+    def as_dicts(built):
+        payload = {"context": context.to_dict(),
+                   "message": {"collector_app_id": "bench-collector.example.com", "receiver_app_id": RECEIVER_APP_ID,
+                               "settlement": {"type": "NP-NP", "id": "settlement-bench", "orders": built}}}
+        return json.dumps(payload, separators=(',', ':'))
+
+    def as_model(built):
+        settlement = Settlement("NP-NP", "settlement-bench", built)
+        return SettlePayload(context, "bench-collector.example.com", RECEIVER_APP_ID, settlement).to_json()
+
+    outputs = {}
+    for label, make, serialize in (("dicts", order_dict, as_dicts), ("model", order_model, as_model)):
+        gc.collect()
+        tracemalloc.start()
+        built = [make(i) for i in range(orders)]
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del built
+        gc.collect()
+        builds = []
+        for _ in range(5):  # median of several builds, garbage collector on as in a real run
+            start = time.perf_counter()
+            built = [make(i) for i in range(orders)]
+            builds.append(time.perf_counter() - start)
+            del built
+            gc.collect()
+        build = sorted(builds)[2]
+        built = [make(i) for i in range(orders)]
+        start = time.perf_counter()
+        outputs[label] = serialize(built)
+        dump = time.perf_counter() - start
+        del built
+        print(f"{label:6} {memory / orders:6.0f} B/order  build {build / orders * 1e6:5.2f} us/order  "
+              f"serialize {dump / orders * 1e6:5.2f} us/order")
+    print(f"byte-identical: {outputs['dicts'] == outputs['model']}")
+
+def bench_context(count=100000):
+    template = ContextTemplate()
+    fields = [("settle", f"bench-txn-{i}", f"bench-msg-{i}", "2026-01-01T00:00:00.000Z") for i in range(count)]
+    base = template.base.to_dict()
+    mismatches = sum(template.render_bytes(*f) != json.dumps(dict(base, action=f[0], transaction_id=f[1],
+                                                                  message_id=f[2], timestamp=f[3]),
+                                                             separators=(',', ':')).encode('utf-8')
+                     for f in fields[:1000])
+    print(f"template vs json.dumps mismatches: {mismatches}/1000")
+    for label, render in (
+            ("json.dumps", lambda f: json.dumps(dict(base, action=f[0], transaction_id=f[1], message_id=f[2],
+                                                     timestamp=f[3]), separators=(',', ':')).encode('utf-8')),
+            ("Context", lambda f: Context(*f).to_json().encode('utf-8')),
+            ("template", lambda f: template.render_bytes(*f))):
+        start = time.perf_counter()
+        for f in fields:
+            render(f)
+        print(f"{label:10} {count / (time.perf_counter() - start):10,.0f} contexts/s")
+
+def bench_bulk(orders=200000):
+    from bulk_orders import generate_orders
+    start = time.perf_counter()
+    batch = generate_orders(orders, seed=1)
+    drawn = time.perf_counter()
+    vectorized = batch.to_json()
+    done = time.perf_counter()
+    print(f"vectorized   draw {drawn - start:6.3f} s  json {done - drawn:6.3f} s  "
+          f"({orders / (done - start):10,.0f} orders/s, {len(vectorized) / 1e6:.1f} MB)")
+    start = time.perf_counter()
+    looped = json.dumps([order.to_dict() for order in batch.orders()], separators=(',', ':'))
+    print(f"python loop  {time.perf_counter() - start:6.3f} s  ({orders / (time.perf_counter() - start):10,.0f} orders/s)  "
+          f"identical: {looped == vectorized}")
+
+def bench_amounts(count=1000000):
+    from decimal import Decimal
+    import numpy as np
+    from amounts import format_paise, parse_paise
+    paise = np.random.default_rng(1).integers(-100_000_00, 100_000_00, size=count, dtype=np.int64)
+    for label, render in (
+            ("Decimal", lambda: [f"{Decimal(p) / 100:.2f}" for p in paise.tolist()]),
+            ("float", lambda: [f"{p / 100:.2f}" for p in paise.tolist()]),
+            ("f-string", lambda: [format_paise(p) for p in paise.tolist()]),
+            ("vectorized", lambda: format_paise(paise).tolist())):
+        start = time.perf_counter()
+        strings = render()
+        print(f"format {label:10} {count / (time.perf_counter() - start):12,.0f} amounts/s")
+    reference = [f"{Decimal(p) / 100:.2f}" for p in paise.tolist()]
+    print(f"mismatches vs Decimal: {sum(a != b for a, b in zip(strings, reference))}/{count}")
+    for label, parse in (
+            ("Decimal", lambda: [int(Decimal(s) * 100) for s in reference]),
+            ("vectorized", lambda: parse_paise(reference))):
+        start = time.perf_counter()
+        parsed = parse()
+        print(f"parse  {label:10} {count / (time.perf_counter() - start):12,.0f} amounts/s")
+    print(f"round trip exact: {bool((np.asarray(parsed) == paise).all())}")
+
+def bench_chunks(orders=100000):
+    from bulk_orders import generate_orders
+    from chunker import SettlementChunker
+    factory = creds.header_factory(RECEIVER_APP_ID, BUYER_KEY)
+    batch = generate_orders(orders, seed=1)
+    start = time.perf_counter()
+    payload = SettlePayload(Context("settle", "bench-txn", "bench-msg"), "bench-collector.example.com",
+                            RECEIVER_APP_ID, Settlement("NP-NP", "bench-settlement", batch))
+    body = Body.from_payload(payload)
+    factory.headers(body.data, digest=body.digest)
+    single = time.perf_counter() - start
+    print(f"one message   {single:6.3f} s to the first (only) request, {len(body) / 1e6:6.1f} MB")
+    for max_orders, max_bytes in ((100, 0), (0, 256_000)):
+        chunker = SettlementChunker("bench-txn", "bench-msg", "bench-settlement", collector_app_id="bench-collector.example.com",
+                                    max_orders=max_orders, max_bytes=max_bytes)
+        start = time.perf_counter()
+        first = None
+        sizes = []
+        for chunk in chunker.chunks(batch):
+            factory.headers(chunk.body.data, digest=chunk.body.digest)
+            first = first or time.perf_counter() - start
+            sizes.append(len(chunk.body))
+        elapsed = time.perf_counter() - start
+        label = f"{max_orders} orders" if max_orders else f"{max_bytes // 1000} kB"
+        print(f"chunks {label:10} {first * 1000:6.1f} ms to the first request, {elapsed:6.3f} s for "
+              f"{len(sizes)} requests, largest {max(sizes) / 1000:,.0f} kB, "
+              f"manifest covers {chunker.manifest.orders}/{orders} orders")
+
+BENCHMARKS = {
+    "headers": bench_headers,
+    "batch": bench_batch,
+    "hash": bench_hash,
+    "sign": bench_sign,
+    "verify": bench_verify,
+    "body": bench_body,
+    "keyring": bench_keyring,
+    "importtime": bench_importtime,
+    "aimd": bench_aimd,
+    "http2": bench_http2,
+    "hedge": bench_hedge,
+    "breaker": bench_breaker,
+    "reply": bench_reply,
+    "resume": bench_resume,
+    "warmup": bench_warmup,
+    "model": bench_model,
+    "context": bench_context,
+    "bulk": bench_bulk,
+    "amounts": bench_amounts,
+    "chunks": bench_chunks,
+}
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        print(f"== {name}")
+        BENCHMARKS[name]()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Request bodies that are encoded to bytes once.
+
+The same buffer is hashed for the BLAKE-512 digest, signed, and handed to the
+transport as `data=`, so the signed bytes and the sent bytes cannot drift apart.
+"""
+import base64
+import hashlib
+import json
+
+from creds import get_headers, hash_message
+
+# Text is flushed to the hasher in blocks of about this many characters.
+CHUNK_SIZE = 64 * 1024
+
+class Body:
+    __slots__ = ("data", "_digest")
+
+    def __init__(self, data: bytes, digest=None):
+        self.data = data
+        self._digest = digest
+
+    @classmethod
+    def from_payload(cls, payload):
+        """Minified JSON exactly as json.dumps(payload, separators=(',', ':')) produces it.
+
+        `payload` is a dict or a payload.py model, which serializes itself.
+        """
+        to_json = getattr(payload, "to_json", None)
+        if to_json is not None:
+            return cls(to_json().encode('utf-8'))
+        return cls(json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+
+    @classmethod
+    def from_chunks(cls, chunks):
+        """Build from all-str or all-bytes pieces, hashing each block as it fills."""
+        hasher = hashlib.blake2b(digest_size=64)
+        parts = []
+        pending = []
+        pending_size = 0
+        for chunk in chunks:
+            pending.append(chunk)
+            pending_size += len(chunk)
+            if pending_size >= CHUNK_SIZE:
+                block = _join(pending)
+                hasher.update(block)
+                parts.append(block)
+                pending = []
+                pending_size = 0
+        if pending:
+            block = _join(pending)
+            hasher.update(block)
+            parts.append(block)
+        data = parts[0] if len(parts) == 1 else b"".join(parts)
+        return cls(data, base64.b64encode(hasher.digest()).decode("utf-8"))
+
+    @property
+    def digest(self):
+        if self._digest is None:
+            self._digest = hash_message(self.data)
+        return self._digest
+
+    @property
+    def text(self):
+        return self.data.decode('utf-8')
+
+    def headers(self, SUBSCRIBER_ID, KEY):
+        return get_headers(SUBSCRIBER_ID, self.data, KEY, digest=self.digest)
+
+    def __len__(self):
+        return len(self.data)
+
+def _join(pending):
+    if isinstance(pending[0], str):
+        return "".join(pending).encode('utf-8')
+    return b"".join(pending)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Circuit breakers for the NOCS endpoints.
+
+Each endpoint (host + path, so /settle and /report separately) gets a breaker
+that opens after `failure_threshold` consecutive failures - connection errors,
+timeouts or 5xx answers. While open, calls fail at once with CircuitOpenError
+instead of waiting out the timeout. After `reset_timeout` seconds the breaker
+half-opens and lets `probes` requests through: if they all succeed it closes,
+if any fails it opens again. State changes are logged.
+"""
+import logging
+import threading
+import time
+from urllib.parse import urlsplit
+
+log = logging.getLogger(__name__)
+
+FAILURE_STATUS = (500, 502, 503, 504)
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending while an endpoint's breaker is open."""
+
+class CircuitBreaker:
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0, probes=1, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probes = probes
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0  # consecutive, while closed
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._probes_sent = 0
+        self._probes_passed = 0
+        self._lock = threading.Lock()
+
+    def _transition(self, state, reason):
+        log.warning("circuit %s: %s -> %s (%s)", self.name, self.state, state, reason)
+        self.state = state
+        if state == OPEN:
+            self._opened_at = self.clock()
+        elif state == HALF_OPEN:
+            self._probes_sent = self._probes_passed = 0
+        else:
+            self.failures = 0
+
+    def before(self):
+        """Reserve the right to send, or raise CircuitOpenError."""
+        with self._lock:
+            if self.state == OPEN:
+                waited = self.clock() - self._opened_at
+                if waited < self.reset_timeout:
+                    self.rejected += 1
+                    raise CircuitOpenError(f"{self.name} circuit open, retry in {self.reset_timeout - waited:.1f}s")
+                self._transition(HALF_OPEN, f"{waited:.1f}s since opening")
+            if self.state == HALF_OPEN:
+                if self._probes_sent >= self.probes:
+                    self.rejected += 1
+                    raise CircuitOpenError(f"{self.name} circuit half-open, waiting for probe")
+                self._probes_sent += 1
+
+    def success(self):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probes_passed += 1
+                if self._probes_passed >= self.probes:
+                    self._transition(CLOSED, f"{self._probes_passed} probe(s) succeeded")
+            else:
+                self.failures = 0
+
+    def _release(self):
+        # The call ended without telling us anything; give a half-open probe slot back
+        with self._lock:
+            if self.state == HALF_OPEN and self._probes_sent > self._probes_passed:
+                self._probes_sent -= 1
+
+    def failure(self, reason):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._transition(OPEN, f"probe failed: {reason}")
+            elif self.state == CLOSED:
+                self.failures += 1
+                if self.failures >= self.failure_threshold:
+                    self._transition(OPEN, f"{self.failures} consecutive failures, last: {reason}")
+
+    def call(self, send):
+        """send() guarded by the breaker; network errors and 5xx responses count as failures.
+
+        Anything else raised (Ctrl-C, task cancellation, a bug in the caller) says nothing about
+        the endpoint and propagates without being recorded.
+        """
+        from transport import network_errors  # transport imports this module
+        self.before()
+        try:
+            response = send()
+        except network_errors() as e:
+            self.failure(f"{type(e).__name__}: {e}")
+            raise
+        except BaseException:
+            self._release()
+            raise
+        if response.status_code in FAILURE_STATUS:
+            self.failure(f"HTTP {response.status_code}")
+        else:
+            self.success()
+        return response
+
+class Breakers:
+    """One CircuitBreaker per endpoint, created on first use."""
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def for_url(self, url):
+        parts = urlsplit(url)
+        name = parts.netloc + parts.path
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(name, CircuitBreaker(name, **self.kwargs))
+        return breaker
+
+    def states(self):
+        return {name: breaker.state for name, breaker in self._breakers.items()}
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Vectorized generator for large NP-NP order batches.
+
+Amounts are drawn as int64 paise arrays in one pass and split exactly: the
+provider and self shares always add up to the inter_participant amount, and
+the collector fee is a fixed share of it. Order ids and provider details are
+kept as columns and only turned into JSON at the end, one template fill per
+order, in the same form as payload.Order.to_json().
+
+    batch = generate_orders(200000, seed=1)
+    orders = batch.order_json()  # list of minified JSON objects
+    payload = SettlePayload(context, collector, receiver, Settlement("NP-NP", settlement_id, batch))
+"""
+from json.encoder import encode_basestring_ascii as _s
+
+import numpy as np
+
+from amounts import format_paise, share, split
+from payload import Amount, BankDetails, Order, Party
+
+def _order_template(prefix, currency):
+    # %-template taking (index, inter_participant, collector, provider head, provider, self)
+    order_id = _s(f"order-{prefix}-")[:-1].replace("%", "%%") + '%d"'
+    amount = '{"amount":{"currency":' + _s(currency).replace("%", "%%") + ',"value":"%s"}}'
+    return ('{"id":' + order_id + ',"inter_participant":' + amount + ',"collector":' + amount
+            + ',"provider":%s' + amount[1:] + ',"self":' + amount + '}')
+
+class OrderBatch:
+    """Columns for `count` orders; amounts in int64 paise, providers as indexes into the provider columns."""
+    __slots__ = ("prefix", "currency", "inter_participant", "collector", "provider", "self_party",
+                 "provider_index", "provider_ids", "provider_names", "account_nos", "ifsc_codes")
+
+    def __init__(self, prefix, currency, inter_participant, collector, provider, self_party,
+                 provider_index, provider_ids, provider_names, account_nos, ifsc_codes):
+        self.prefix = prefix
+        self.currency = currency
+        self.inter_participant = inter_participant
+        self.collector = collector
+        self.provider = provider
+        self.self_party = self_party
+        self.provider_index = provider_index
+        self.provider_ids = provider_ids
+        self.provider_names = provider_names
+        self.account_nos = account_nos
+        self.ifsc_codes = ifsc_codes
+
+    def __len__(self):
+        return len(self.inter_participant)
+
+    def order_ids(self):
+        return [f"order-{self.prefix}-{i}" for i in range(len(self))]
+
+    def _provider_heads(self):
+        # Everything in a provider object before its amount, escaped once per provider
+        return np.array([
+            f'{{"id":{_s(pid)},"name":{_s(name)},"bank_details":{{"account_no":{_s(account)},'
+            f'"ifsc_code":{_s(ifsc)}}},'
+            for pid, name, account, ifsc in zip(self.provider_ids, self.provider_names,
+                                                 self.account_nos, self.ifsc_codes)], dtype=object)
+
+    def order_json(self, start=0, stop=None):
+        """One minified JSON object per order in [start, stop), identical to payload.Order.to_json()."""
+        template = _order_template(self.prefix, self.currency)
+        rows = slice(start, stop)
+        columns = (range(len(self))[rows],
+                   format_paise(self.inter_participant[rows]).tolist(),
+                   format_paise(self.collector[rows]).tolist(),
+                   self._provider_heads()[self.provider_index[rows]].tolist(),
+                   format_paise(self.provider[rows]).tolist(),
+                   format_paise(self.self_party[rows]).tolist())
+        return [template % row for row in zip(*columns)]
+
+    def iter_order_json(self, block=4096):
+        """order_json() a block at a time, for consumers that stream the batch."""
+        for start in range(0, len(self), block):
+            yield from self.order_json(start, start + block)
+
+    def to_json(self):
+        """The JSON array for settlement.orders, so a batch can stand in for the list in payload.Settlement."""
+        return "[" + ",".join(self.order_json()) + "]"
+
+    def to_dict(self):
+        return [order.to_dict() for order in self.orders()]
+
+    def orders(self):
+        """payload.Order objects for the batch, for code that wants the model rather than text."""
+        values = [format_paise(column).tolist()
+                  for column in (self.inter_participant, self.collector, self.provider, self.self_party)]
+        providers = [(pid, name, BankDetails(account, ifsc)) for pid, name, account, ifsc
+                     in zip(self.provider_ids, self.provider_names, self.account_nos, self.ifsc_codes)]
+        currency = self.currency
+        result = []
+        for order_id, index, inter, fee, provided, own in zip(self.order_ids(), self.provider_index.tolist(), *values):
+            pid, name, bank = providers[index]
+            result.append(Order(order_id, Party(Amount(inter, currency)), Party(Amount(fee, currency)),
+                                Party(Amount(provided, currency), pid, name, bank), Party(Amount(own, currency))))
+        return result
+
+def generate_orders(count, seed=None, prefix="bulk", providers=100, min_paise=100_00, max_paise=100_000_00,
+                    collector_bps=500, self_bps=2000, currency="INR"):
+    """`count` NP-NP orders with inter_participant amounts drawn uniformly from [min_paise, max_paise].
+
+    self gets self_bps basis points of each inter_participant amount (rounded down) and the
+    provider the rest; the collector fee is collector_bps basis points of it.
+    """
+    rng = np.random.default_rng(seed)
+    inter_participant = rng.integers(min_paise, max_paise, size=count, endpoint=True, dtype=np.int64)
+    self_party, provider = split(inter_participant, self_bps)
+    collector = share(inter_participant, collector_bps)
+    provider_index = rng.integers(0, providers, size=count)
+    numbers = np.arange(providers)
+    account_nos = rng.integers(10**9, 10**10, size=providers)
+    return OrderBatch(prefix, currency, inter_participant, collector, provider, self_party, provider_index,
+                      [f"prvdr-{prefix}-{n}" for n in numbers.tolist()],
+                      [f"Test Provider {n}" for n in numbers.tolist()],
+                      [str(n) for n in account_nos.tolist()],
+                      [f"TEST0{n:06d}" for n in numbers.tolist()])
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""Split one large logical settlement into several /settle messages.
+
+The gateway takes at most 100 orders per payload and rejects a repeated
+transaction, message or settlement id, so every chunk gets its own three,
+derived from the logical batch's ids ("<id>-<index>"), and the Manifest
+records which orders went out under which ids. Chunks are built lazily: each
+one is serialized, hashed and handed on before the next order is read, so a
+batch of any size is sent with one chunk in memory.
+
+    chunker = SettlementChunker("txn-1", "msg-1", "settlement-1", max_bytes=256_000)
+    for chunk, response in send_chunks(chunker.chunks(orders)):
+        print(chunk.index, response.status_code)
+    json.dump(chunker.manifest.to_dict(), manifest_file)
+"""
+import json
+
+from body import Body
+from creds import RECEIVER_APP_ID, SETTLE_ENDPOINT, config, header_factory
+from payload import ContextTemplate, SettlePayload, Settlement
+
+class _Marker:
+    # Stands in for the context while the fixed parts of the message are serialized;
+    # a raw NUL cannot appear in escaped JSON, so splitting on it is unambiguous
+    def to_json(self):
+        return "\x00"
+
+def _order_bytes(order):
+    if isinstance(order, bytes):
+        return order
+    if isinstance(order, str):
+        return order.encode('utf-8')  # already-serialized JSON, e.g. from OrderBatch.order_json()
+    to_json = getattr(order, "to_json", None)
+    if to_json is not None:
+        return to_json().encode('utf-8')
+    return json.dumps(order, separators=(',', ':')).encode('utf-8')
+
+class Chunk:
+    """One signed-ready /settle message: orders[start:start + count] of the logical batch."""
+    __slots__ = ("index", "transaction_id", "message_id", "settlement_id", "start", "count", "body")
+
+    def __init__(self, index, transaction_id, message_id, settlement_id, start, count, body):
+        self.index = index
+        self.transaction_id = transaction_id
+        self.message_id = message_id
+        self.settlement_id = settlement_id
+        self.start = start
+        self.count = count
+        self.body = body
+
+    def to_json(self):
+        return self.body.text
+
+    def to_dict(self):
+        return json.loads(self.body.data)
+
+    def entry(self):
+        return {"index": self.index, "transaction_id": self.transaction_id, "message_id": self.message_id,
+                "settlement_id": self.settlement_id, "start": self.start, "count": self.count,
+                "bytes": len(self.body), "digest": self.body.digest}
+
+class Manifest:
+    """Which chunk carried which orders of the logical settlement."""
+
+    def __init__(self, transaction_id, message_id, settlement_id, settlement_type):
+        self.transaction_id = transaction_id
+        self.message_id = message_id
+        self.settlement_id = settlement_id
+        self.settlement_type = settlement_type
+        self.chunks = []
+        self.orders = 0
+        self.complete = False  # set once the last order has been chunked
+
+    def add(self, chunk):
+        self.chunks.append(chunk.entry())
+        self.orders += chunk.count
+
+    def chunk_for(self, order_index):
+        """Manifest entry of the chunk holding the order at order_index in the logical batch."""
+        for entry in self.chunks:
+            if entry["start"] <= order_index < entry["start"] + entry["count"]:
+                return entry
+        return None
+
+    def to_dict(self):
+        return {"transaction_id": self.transaction_id, "message_id": self.message_id,
+                "settlement_id": self.settlement_id, "type": self.settlement_type, "orders": self.orders,
+                "complete": self.complete, "chunks": self.chunks}
+
+class SettlementChunker:
+    """Builds the /settle messages for one logical settlement, under max_orders and max_bytes each.
+
+    Limits left as None come from CHUNK_ORDERS and CHUNK_BYTES; 0 means no limit.
+    """
+
+    def __init__(self, transaction_id, message_id, settlement_id, settlement_type="NP-NP",
+                 collector_app_id=None, receiver_app_id=RECEIVER_APP_ID, max_orders=None, max_bytes=None,
+                 template=None):
+        self.transaction_id = transaction_id
+        self.message_id = message_id
+        self.settlement_id = settlement_id
+        self.settlement_type = settlement_type
+        self.collector_app_id = config.COLLECTOR_APP_ID if collector_app_id is None else collector_app_id
+        self.receiver_app_id = receiver_app_id
+        self.max_orders = int(config.CHUNK_ORDERS if max_orders is None else max_orders)
+        self.max_bytes = int(config.CHUNK_BYTES if max_bytes is None else max_bytes)
+        self.template = template or ContextTemplate()
+        self.manifest = Manifest(transaction_id, message_id, settlement_id, settlement_type)
+
+    def ids(self, index):
+        """(transaction_id, message_id, settlement_id) of chunk `index`."""
+        return f"{self.transaction_id}-{index}", f"{self.message_id}-{index}", f"{self.settlement_id}-{index}"
+
+    def _frame(self, settlement_id):
+        # '{"context":' and everything from the end of the context up to the first order, then ']}}}'
+        text = SettlePayload(_Marker(), self.collector_app_id, self.receiver_app_id,
+                             Settlement(self.settlement_type, settlement_id, [])).to_json()
+        head, rest = text.split("\x00")
+        return head.encode('ascii'), rest[:-4].encode('ascii'), rest[-4:].encode('ascii')
+
+    def chunks(self, orders):
+        """Yield Chunks for `orders` (payload.Order objects, dicts, JSON strings or an OrderBatch) as they fill.
+
+        Resets self.manifest, which is complete once the generator is exhausted.
+        An order that does not fit in max_bytes on its own raises ValueError.
+        """
+        if hasattr(orders, "iter_order_json"):
+            orders = orders.iter_order_json()
+        self.manifest = manifest = Manifest(self.transaction_id, self.message_id, self.settlement_id,
+                                            self.settlement_type)
+        index = start = 0
+        pending = []
+        frame = self._open(index)
+        size = sum(len(part) for part in frame[3:])
+        for position, order in enumerate(orders):
+            data = _order_bytes(order)
+            if pending and ((self.max_orders and len(pending) >= self.max_orders)
+                            or (self.max_bytes and size + 1 + len(data) > self.max_bytes)):
+                chunk = self._close(index, start, frame, pending)
+                manifest.add(chunk)
+                yield chunk
+                index += 1
+                start = position
+                pending = []
+                frame = self._open(index)  # after the yield, so the context timestamp is taken at build time
+                size = sum(len(part) for part in frame[3:])
+            size += len(data) + (1 if pending else 0)  # the comma before every order but the first
+            if self.max_bytes and size > self.max_bytes:
+                raise ValueError(f"order {position} needs a {size}-byte message of its own, "
+                                 f"over max_bytes={self.max_bytes}")
+            pending.append(data)
+        if pending:
+            chunk = self._close(index, start, frame, pending)
+            manifest.add(chunk)
+            yield chunk
+        manifest.complete = True
+
+    def _open(self, index):
+        transaction_id, message_id, settlement_id = self.ids(index)
+        head, middle, tail = self._frame(settlement_id)
+        context = self.template.render_bytes("settle", transaction_id, message_id)
+        return transaction_id, message_id, settlement_id, head, context, middle, tail
+
+    def _close(self, index, start, frame, pending):
+        transaction_id, message_id, settlement_id, head, context, middle, tail = frame
+        parts = [head, context, middle, pending[0]]
+        for data in pending[1:]:
+            parts.append(b",")
+            parts.append(data)
+        parts.append(tail)
+        return Chunk(index, transaction_id, message_id, settlement_id, start, len(pending), Body.from_chunks(parts))
+
+def send_chunks(chunks, transport=None, factory=None, url=SETTLE_ENDPOINT, timeout=30):
+    """Sign and POST each chunk as soon as it is built; yields (chunk, response) in order."""
+    if transport is None:
+        from transport import get_transport
+        transport = get_transport()
+    factory = factory or header_factory(config.SUBSCRIBER_ID, config.PRIVATE_KEY)
+    for chunk in chunks:
+        body = chunk.body
+        headers = factory.headers(body.data, digest=body.digest)
+        yield chunk, transport.post(url, data=body.data, headers=headers, timeout=timeout)
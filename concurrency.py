@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""AIMD concurrency control for gateway calls.
+
+The in-flight limit grows by about one request per round trip while latency
+and the ACK rate stay healthy, and is cut multiplicatively on timeouts, 5xx
+and 429 responses or when latency climbs well above the best seen.
+"""
+import asyncio
+import contextlib
+import time
+
+# Status codes treated as the gateway asking us to slow down
+OVERLOAD_STATUS = (429, 500, 502, 503, 504)
+
+class AIMDLimiter:
+    def __init__(self, initial=4, minimum=1, maximum=256, decrease=0.5,
+                 latency_tolerance=2.0, min_ack_rate=0.5, smoothing=0.1):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance  # back off above this multiple of the best latency
+        self.min_ack_rate = min_ack_rate  # hold the limit while fewer requests than this are ACKed
+        self.smoothing = smoothing
+        self.in_flight = 0
+        self.latency = None  # exponentially weighted moving average, seconds
+        self.best_latency = None
+        self.ack_rate = 1.0
+        self.counts = {"ok": 0, "nack": 0, "overload": 0, "slow": 0, "decreases": 0}
+        self._last_decrease = 0.0
+        self._condition = None
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+
+    def record(self, latency, status=None, ack=None):
+        """Feed back one finished request; status None means it timed out or failed to connect."""
+        if status is None or status in OVERLOAD_STATUS:
+            self.counts["overload"] += 1
+            self._back_off()
+            return
+        self.latency = latency if self.latency is None else self.latency + self.smoothing * (latency - self.latency)
+        self.best_latency = latency if self.best_latency is None else min(self.best_latency, latency)
+        acked = status == 200 if ack is None else ack
+        self.ack_rate += self.smoothing * ((1.0 if acked else 0.0) - self.ack_rate)
+        self.counts["ok" if acked else "nack"] += 1
+        if self.latency > self.best_latency * self.latency_tolerance:
+            self.counts["slow"] += 1
+            self._back_off()
+        elif self.ack_rate >= self.min_ack_rate:
+            self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+
+    def _back_off(self):
+        # One cut per round trip: the requests already in flight were sent under the old limit
+        now = time.monotonic()
+        if now - self._last_decrease < (self.latency or 0.0):
+            return
+        self._last_decrease = now
+        self.limit = max(self.minimum, self.limit * self.decrease)
+        self.counts["decreases"] += 1
+        if self.latency is not None and self.best_latency is not None:
+            # let the baseline drift up so one lucky fast sample cannot pin the limit down
+            self.best_latency += self.smoothing * (self.latency - self.best_latency)
+
+    def metrics(self):
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "latency_ms": None if self.latency is None else round(self.latency * 1000, 1),
+            "best_latency_ms": None if self.best_latency is None else round(self.best_latency * 1000, 1),
+            "ack_rate": round(self.ack_rate, 3),
+            **self.counts,
+        }
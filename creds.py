@@ -1,76 +1,380 @@
 #!/usr/bin/env python3
 import base64
-import datetime
+import functools
+import hashlib
 import os
-import dotenv
-import nacl.encoding
-import nacl.hash
-from nacl.bindings import crypto_sign_ed25519_sk_to_seed
-from nacl.signing import SigningKey
-
-dotenv.load_dotenv()
+import re
+import time
 
 # API endpoint
 SETTLE_ENDPOINT = "https://ondcnbbl.npci.org.in/nocs/v2/settle"
 REPORT_ENDPOINT = "https://ondcnbbl.npci.org.in/nocs/v2/report"
 
 
-SUBSCRIBER_ID = os.environ.get('SUBSCRIBER_ID')
-UNIQUE_KEY_ID = os.environ.get('UNIQUE_KEY_ID')
-PRIVATE_KEY = os.environ.get('PRIVATE_KEY')
 BUYER_KEY = "G0Pme72u8Y1MwxHqvY4iBW+7VPtJ7dsX7SGs6zZ5yvVIzdRAyHR6YkwHG2ufOE+12lsbJRwBF4Hqd7dUEOZZkg=="
 
 
-COLLECTOR_APP_ID = os.environ.get('SUBSCRIBER_ID') #Reffer to intergration docs for info
 RECEIVER_APP_ID = "SellerAppTestdata12.com" #Reffer to intergration docs for info
 DIFFERENT_COLLECTOR_APP_ID = "different-collector.samhita.org" # Different collector app id
 
 
-BAP_ID = os.environ.get('BAP_ID')
-BAP_URI = os.environ.get('BAP_URI')
 BPP_ID = "sa_nocs.nbbl.com"
 BPP_URI = "https://sa_nocs.nbbl.com/nocs_test"
 
-def hash_message(msg: str):
-    HASHER = nacl.hash.blake2b
-    digest = HASHER(bytes(msg, 'utf-8'), digest_size=64, encoder=nacl.encoding.Base64Encoder)
-    digest_str = digest.decode("utf-8")
-    return digest_str
+# Fallbacks for settings missing from the environment and .env; edit here to configure directly.
+DEFAULTS = {
+    'SUBSCRIBER_ID': None,
+    'UNIQUE_KEY_ID': None,
+    'PRIVATE_KEY': None,
+    'BAP_ID': None,
+    'BAP_URI': None,
+    'HASH_BACKEND': 'auto',  # BLAKE-512 implementation: "nacl", "hashlib" or "auto"
+    'SIGN_BACKEND': 'auto',  # Ed25519 implementation: "nacl", "cryptography" or "auto"
+    'POOL_SIZE': '10',  # kept-alive connections per gateway host
+    'KEEP_ALIVE': '1',
+    'WARM_UP': '0',  # connections opened ahead of the first request
+    'TIMINGS': '0',  # per-phase request timings, summarised at exit
+    'HTTP2': '0',  # multiplex over HTTP/2 via httpx when the gateway negotiates it
+    'BREAKER_FAILURES': '5',  # consecutive failures that open an endpoint's circuit, 0 disables
+    'BREAKER_RESET': '30',  # seconds an open circuit fails fast before probing again
+    'BREAKER_PROBES': '1',  # successful probes needed to close it again
+    'DNS_TTL': '60',  # seconds a resolved gateway address is reused, 0 resolves per connection
+    'TLS_RESUME': '1',  # resume the previous TLS session on new connections
+    'CHUNK_ORDERS': '100',  # orders per /settle message when chunking a large settlement, 0 for no limit
+    'CHUNK_BYTES': '0',  # body bytes per chunked /settle message, 0 for no limit
+}
+
+class _Config:
+    """Environment-backed settings; .env is read on first attribute access, not at import."""
+
+    def __init__(self):
+        self._values = None
+
+    def _load(self):
+        import dotenv
+        dotenv.load_dotenv()
+        values = {name: os.environ.get(name, default) for name, default in DEFAULTS.items()}
+        values['COLLECTOR_APP_ID'] = values['SUBSCRIBER_ID'] #Reffer to intergration docs for info
+        self._values = values
+
+    def __getattr__(self, name):
+        if self._values is None:
+            self._load()
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+config = _Config()
+
+def __getattr__(name):
+    # SUBSCRIBER_ID, PRIVATE_KEY, BAP_ID, ... resolve through config on first use
+    try:
+        return getattr(config, name)
+    except AttributeError:
+        raise AttributeError(f"module 'creds' has no attribute {name!r}") from None
+
+# Selected BLAKE-512 backend name, set on first hash (see config.HASH_BACKEND)
+HASH_BACKEND = None
+_hasher = None
+
+def _blake2b_nacl(data: bytes):
+    import nacl.encoding
+    import nacl.hash
+    digest = nacl.hash.blake2b(data, digest_size=64, encoder=nacl.encoding.Base64Encoder)
+    return digest.decode("utf-8")
+
+def _blake2b_hashlib(data: bytes):
+    digest = hashlib.blake2b(data, digest_size=64).digest()
+    return base64.b64encode(digest).decode("utf-8")
+
+# In "auto" preference order
+HASH_BACKENDS = {
+    "nacl": _blake2b_nacl,
+    "hashlib": _blake2b_hashlib,
+}
+
+# Cross-check vectors: empty, ASCII, non-ASCII and a body larger than one block run
+HASH_SAMPLES = [b"", b"{}", '{"value":"\u20b9 1000.00"}'.encode('utf-8'), bytes(range(256)) * 400]
+# What "auto" times the backends on: about the size of a one-order /settle body
+HASH_TIMING_BODY = bytes(range(256)) * 8
+
+def _hash_agrees(hasher, samples=HASH_SAMPLES):
+    reference = HASH_BACKENDS["nacl"]
+    return all(hasher(sample) == reference(sample) for sample in samples)
+
+def check_hash_backends(samples=HASH_SAMPLES):
+    """Names of backends whose digest differs from the PyNaCl reference on any sample."""
+    return [name for name, hasher in HASH_BACKENDS.items() if not _hash_agrees(hasher, samples)]
+
+def _fastest(calls, repeat=5, number=20):
+    # median of `repeat` timed runs per candidate, so one scheduler hiccup cannot decide it
+    timings = {}
+    for name, call in calls.items():
+        runs = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                call()
+            runs.append(time.perf_counter() - start)
+        timings[name] = sorted(runs)[repeat // 2]
+    return min(timings, key=timings.get)
+
+def _choose(kind, backends, name, works, workload):
+    # "auto" times `workload(backend)` for every backend that passes the cross-check and takes the fastest
+    if name != "auto":
+        if name not in backends:
+            raise ValueError(f"unknown {kind} backend {name!r}; expected one of: auto, {', '.join(backends)}")
+        if not works(backends[name]):
+            raise RuntimeError(f"{kind} backend {name!r} fails the cross-check")
+        return name
+    passing = {candidate: workload(backend) for candidate, backend in backends.items() if works(backend)}
+    if not passing:
+        raise RuntimeError(f"no {kind} backend passes the cross-check (tried {', '.join(backends)})")
+    return _fastest(passing) if len(passing) > 1 else next(iter(passing))
+
+def select_hash_backend(name=None):
+    global _hasher, HASH_BACKEND
+    if name is None:
+        name = config.HASH_BACKEND
+    name = _choose("hash", HASH_BACKENDS, name, _hash_agrees, lambda hasher: lambda: hasher(HASH_TIMING_BODY))
+    _hasher = HASH_BACKENDS[name]
+    HASH_BACKEND = name
+    return name
+
+def hash_message(msg):
+    if isinstance(msg, str):
+        msg = msg.encode('utf-8')
+    if _hasher is None:
+        select_hash_backend()
+    return _hasher(msg)
 
 def create_signing_string(digest_base64, created=None, expires=None):
-    if created is None:
-        created = int(datetime.datetime.now().timestamp())
-    if expires is None:
-        expires = int((datetime.datetime.now() + datetime.timedelta(hours=1)).timestamp())
+    if created is None or expires is None:
+        now = int(time.time())
+        created = now if created is None else created
+        expires = now + 3600 if expires is None else expires
     signing_string = f"""(created): {created}
 (expires): {expires}
 digest: BLAKE-512={digest_base64}"""
     return signing_string
 
-def sign_response(signing_key, private_key):
+# Selected Ed25519 backend name, set on first signature (see config.SIGN_BACKEND)
+SIGN_BACKEND = None
+_make_signer = None
+
+def _signer_nacl(seed: bytes):
+    from nacl.signing import SigningKey
+    key = SigningKey(seed)
+    return lambda message: key.sign(message).signature
+
+def _signer_cryptography(seed: bytes):
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+    return Ed25519PrivateKey.from_private_bytes(seed).sign
+
+# In "auto" preference order
+SIGN_BACKENDS = {
+    "nacl": _signer_nacl,
+    "cryptography": _signer_cryptography,  # optional dependency; skipped by "auto" if missing
+}
+
+# RFC 8032 section 7.1, TEST 1 and TEST 2: (seed, message, signature)
+SIGN_GOLDEN_VECTORS = [
+    (bytes.fromhex("9d61b19deffd5a60ba844af492ec2cc44449c5697b326919703bac031cae7f60"), b"",
+     bytes.fromhex("e5564300c360ac729086e2cc806e828a84877f1eb8e5d974d873e065224901555fb8821590a33bacc61e39701cf9b46bd25bf5f0595bbe24655141438e7a100b")),
+    (bytes.fromhex("4ccd089b28ff96da9db6c346ec114e0f5b8a319f35aba624da8cf6ed4fb8a6fb"), b"\x72",
+     bytes.fromhex("92a009a9f0d4cab8720e820b5f642540a2b27b5416503f8fb3762223ebdb69da085ac1e43e15996e458f3613d0f11d8c387b2eaeb4302aeeb00d291612bb0c00")),
+]
+
+def _signs_vectors(make_signer, vectors=SIGN_GOLDEN_VECTORS):
+    try:
+        return all(make_signer(seed)(message) == signature for seed, message, signature in vectors)
+    except ImportError:
+        return False
+
+def check_sign_backends(vectors=SIGN_GOLDEN_VECTORS):
+    """Names of backends that are not installed or do not reproduce every golden signature."""
+    return [name for name, make_signer in SIGN_BACKENDS.items() if not _signs_vectors(make_signer, vectors)]
+
+def select_sign_backend(name=None):
+    global _make_signer, SIGN_BACKEND
+    if name is None:
+        name = config.SIGN_BACKEND
+    seed, _, _ = SIGN_GOLDEN_VECTORS[0]
+    message = create_signing_string("A" * 88, 0, 0).encode('utf-8')  # the shape of every signed string
+    name = _choose("sign", SIGN_BACKENDS, name, _signs_vectors,
+                   lambda make_signer: functools.partial(make_signer(seed), message))
+    _make_signer = SIGN_BACKENDS[name]
+    SIGN_BACKEND = name
+    clear_signers()
+    return name
+
+# Prepared signers keyed by (subscriber id, unique key id), so each private key
+# is decoded and expanded once per process instead of once per request.
+_SIGNERS = {}
+# Default-clock HeaderFactory per subscriber id, behind create_authorisation_header/get_headers
+_FACTORIES = {}
+
+def load_signer(private_key, subscriber_id=None, unique_key_id=None):
+    handle = (subscriber_id, config.UNIQUE_KEY_ID if unique_key_id is None else unique_key_id)
+    cached = _SIGNERS.get(handle)
+    if cached is not None and cached[0] == private_key:
+        return cached[1]
+    from nacl.bindings import crypto_sign_ed25519_sk_to_seed
+    if _make_signer is None:
+        select_sign_backend()
     private_key64 = base64.b64decode(private_key)
     seed = crypto_sign_ed25519_sk_to_seed(private_key64)
-    signer = SigningKey(seed)
-    signed = signer.sign(bytes(signing_key, encoding='utf8'))
-    signature = base64.b64encode(signed.signature).decode()
+    signer = _make_signer(seed)
+    _SIGNERS[handle] = (private_key, signer)
+    register_public_key(handle[0], handle[1], private_key64[32:])
+    return signer
+
+def clear_signers():
+    _SIGNERS.clear()
+    _FACTORIES.clear()
+
+def sign_response(signing_key, private_key, subscriber_id=None):
+    signer = load_signer(private_key, subscriber_id)
+    signature = base64.b64encode(signer(bytes(signing_key, encoding='utf8'))).decode()
     return signature
 
-def create_authorisation_header(SUBSCRIBER_ID,request_body,KEY, created=None, expires=None):
-    created = int(datetime.datetime.now().timestamp()) if created is None else created
-    expires = int((datetime.datetime.now() + datetime.timedelta(hours=1)).timestamp()) if expires is None else expires
-    signing_key = create_signing_string(hash_message(request_body),
-                                        created=created, expires=expires)
-    signature = sign_response(signing_key, private_key=KEY)
-
-    header = f'Signature keyId="{SUBSCRIBER_ID}|{UNIQUE_KEY_ID}|ed25519",algorithm="ed25519",created="{created}",expires="{expires}",headers="(created) (expires) digest",signature="{signature}"'
-    return header
-
-def get_headers(SUBSCRIBER_ID,request_body,KEY):
-    auth_header = create_authorisation_header(SUBSCRIBER_ID,request_body,KEY)
-    return {
-        'Content-Type': 'application/json',
-        'Accept': 'application/json',
-        'User-Agent': 'nocs-user/2.0.0',
-        'Authorization': auth_header,
-        'X-Gateway-Authorization': auth_header
-    } 
\ No newline at end of file
+HEADER_EXPIRY = 3600  # seconds between created and expires
+
+class HeaderFactory:
+    """Authorization headers for one identity.
+
+    The keyId prefix and signer are prepared once; the clock is read once per
+    header through `clock`, which benchmarks can replace with a fixed source.
+    """
+
+    def __init__(self, subscriber_id, private_key, unique_key_id=None, clock=time.time, expiry=HEADER_EXPIRY):
+        self.subscriber_id = subscriber_id
+        self.unique_key_id = config.UNIQUE_KEY_ID if unique_key_id is None else unique_key_id
+        self.clock = clock
+        self.expiry = expiry
+        self._sign = load_signer(private_key, subscriber_id, self.unique_key_id)
+        self._prefix = f'Signature keyId="{subscriber_id}|{self.unique_key_id}|ed25519",algorithm="ed25519",created="'
+
+    def signature(self, signing_string):
+        return base64.b64encode(self._sign(signing_string.encode('utf-8'))).decode()
+
+    def authorisation_header(self, request_body, created=None, expires=None, digest=None):
+        if created is None or expires is None:
+            now = int(self.clock())
+            created = now if created is None else created
+            expires = now + self.expiry if expires is None else expires  # from now, as before, even for an old `created`
+        if digest is None:
+            digest = hash_message(request_body)
+        signature = self.signature(f"(created): {created}\n(expires): {expires}\ndigest: BLAKE-512={digest}")
+        return f'{self._prefix}{created}",expires="{expires}",headers="(created) (expires) digest",signature="{signature}"'
+
+    def headers(self, request_body, digest=None):
+        auth_header = self.authorisation_header(request_body, digest=digest)
+        return {
+            'Content-Type': 'application/json',
+            'Accept': 'application/json',
+            'User-Agent': 'nocs-user/2.0.0',
+            'Authorization': auth_header,
+            'X-Gateway-Authorization': auth_header
+        }
+
+def header_factory(SUBSCRIBER_ID, KEY):
+    cached = _FACTORIES.get(SUBSCRIBER_ID)
+    if cached is not None and cached[0] == KEY and cached[1].unique_key_id == config.UNIQUE_KEY_ID:
+        return cached[1]
+    factory = HeaderFactory(SUBSCRIBER_ID, KEY)
+    _FACTORIES[SUBSCRIBER_ID] = (KEY, factory)
+    return factory
+
+def create_authorisation_header(SUBSCRIBER_ID,request_body,KEY, created=None, expires=None, digest=None):
+    return header_factory(SUBSCRIBER_ID, KEY).authorisation_header(request_body, created, expires, digest)
+
+def get_headers(SUBSCRIBER_ID,request_body,KEY, digest=None):
+    return header_factory(SUBSCRIBER_ID, KEY).headers(request_body, digest)
+
+# Below this many bodies the pool start-up costs more than it saves.
+BATCH_MIN_PARALLEL = 256
+
+def get_headers_batch(bodies, KEY, SUBSCRIBER_ID=None, workers=None):
+    """Headers for many request bodies, in input order, signed across a process pool."""
+    from concurrent.futures import ProcessPoolExecutor
+    bodies = list(bodies)
+    if SUBSCRIBER_ID is None:
+        SUBSCRIBER_ID = config.SUBSCRIBER_ID
+    sign_one = functools.partial(get_headers, SUBSCRIBER_ID, KEY=KEY)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(bodies) < BATCH_MIN_PARALLEL:
+        return [sign_one(body) for body in bodies]
+    chunksize = max(1, len(bodies) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(sign_one, bodies, chunksize=chunksize))
+
+class SignatureError(ValueError):
+    """Authorization header rejected; args[0] is a short reason code such as "expired"."""
+
+# Public keys keyed by the "subscriber_id|unique_key_id" part of keyId, as raw
+# bytes until first used and a VerifyKey after that. Every key loaded for
+# signing is registered here too, so self-checks need no setup.
+_PUBLIC_KEYS = {}
+
+def register_public_key(subscriber_id, unique_key_id, public_key):
+    if isinstance(public_key, str):
+        public_key = base64.b64decode(public_key)
+    _PUBLIC_KEYS[f"{subscriber_id}|{unique_key_id}"] = public_key
+
+_AUTH_HEADER = re.compile(r'Signature \w+="[^"]*"(?:,\w+="[^"]*")*')
+_AUTH_PARAM = re.compile(r'(\w+)="([^"]*)"')
+_TIMESTAMP = re.compile(r'[0-9]+')  # not str.isdigit(), which also takes "²" and other scripts' digits
+_SIGNED_HEADERS = "(created) (expires) digest"
+
+def parse_authorisation_header(header):
+    if not header or not _AUTH_HEADER.fullmatch(header):
+        raise SignatureError("malformed")
+    params = dict(_AUTH_PARAM.findall(header))
+    for name in ("keyId", "algorithm", "created", "expires", "headers", "signature"):
+        if name not in params:
+            raise SignatureError("missing-" + name)
+    return params
+
+def verify_authorisation_header(header, request_body, now=None):
+    """Check an Authorization header against request_body; returns its parameters or raises SignatureError."""
+    params = parse_authorisation_header(header)
+    key_id = params["keyId"].split("|")
+    if len(key_id) != 3 or key_id[2] != "ed25519":
+        raise SignatureError("bad-key-id")
+    if params["algorithm"] != "ed25519":
+        raise SignatureError("bad-algorithm")
+    if params["headers"] != _SIGNED_HEADERS:
+        raise SignatureError("bad-headers")
+    created, expires = params["created"], params["expires"]
+    if not (_TIMESTAMP.fullmatch(created) and _TIMESTAMP.fullmatch(expires)):
+        raise SignatureError("bad-timestamp")
+    created, expires = int(created), int(expires)
+    now = int(time.time()) if now is None else now
+    if created > expires:
+        raise SignatureError("bad-timestamp")
+    if expires < now:
+        raise SignatureError("expired")
+    if created > now:
+        raise SignatureError("not-yet-valid")
+    try:
+        signature = base64.b64decode(params["signature"], validate=True)
+    except ValueError:
+        raise SignatureError("bad-signature-encoding") from None
+    if len(signature) != 64:
+        raise SignatureError("bad-signature-encoding")
+    handle = f"{key_id[0]}|{key_id[1]}"
+    verify_key = _PUBLIC_KEYS.get(handle)
+    if verify_key is None:
+        raise SignatureError("unknown-key")
+    from nacl.exceptions import BadSignatureError
+    if isinstance(verify_key, bytes):
+        from nacl.signing import VerifyKey
+        verify_key = _PUBLIC_KEYS[handle] = VerifyKey(verify_key)
+    signing_string = create_signing_string(hash_message(request_body), created=created, expires=expires)
+    try:
+        verify_key.verify(signing_string.encode('utf-8'), signature)
+    except BadSignatureError:
+        raise SignatureError("bad-signature") from None
+    return params
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Hedging for idempotent /report lookups.
+
+If a report has not answered within a percentile of recent report latency, a
+second signed copy with a new message_id is sent and whichever answers first
+wins. Hedges are capped at a fraction of all reports so a slow gateway does
+not get twice the load.
+"""
+from collections import deque
+
+class HedgePolicy:
+    def __init__(self, percentile=0.95, window=200, min_samples=20, initial_delay=1.0, max_ratio=0.1):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.initial_delay = initial_delay  # used until `min_samples` latencies have been seen
+        self.max_ratio = max_ratio  # most hedges allowed per report sent
+        self.latencies = deque(maxlen=window)  # primary requests only, seconds
+        self.counts = {"reports": 0, "hedged": 0, "hedge_won": 0, "budget_exhausted": 0}
+        self.saved = 0.0  # seconds by which winning hedges beat their primary
+
+    def delay(self):
+        """Seconds to wait for the primary before hedging."""
+        if len(self.latencies) < self.min_samples:
+            return self.initial_delay
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(self.percentile * len(ordered)))]
+
+    def allow(self):
+        if self.counts["hedged"] < self.max_ratio * self.counts["reports"]:
+            return True
+        self.counts["budget_exhausted"] += 1
+        return False
+
+    def record(self, latency):
+        self.latencies.append(latency)
+
+    def metrics(self):
+        return {
+            **self.counts,
+            "delay_ms": round(self.delay() * 1000, 1),
+            "saved_s": round(self.saved, 3),
+            "saved_per_win_ms": round(self.saved * 1000 / self.counts["hedge_won"], 1) if self.counts["hedge_won"] else None,
+        }
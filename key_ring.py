@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Many collector/receiver identities for load tests.
+
+`creds` carries one collector (SUBSCRIBER_ID/PRIVATE_KEY) and one receiver
+(RECEIVER_APP_ID/BUYER_KEY). A KeyRing holds any number of them, keyed by app
+id, and hands out prepared HeaderFactory objects.
+"""
+import base64
+import json
+import os
+
+from creds import BUYER_KEY, RECEIVER_APP_ID, HeaderFactory, config, register_public_key
+
+COLLECTOR = "collector"
+RECEIVER = "receiver"
+
+class Identity:
+    __slots__ = ("app_id", "role", "subscriber_id", "unique_key_id", "private_key")
+
+    def __init__(self, app_id, role, private_key, subscriber_id=None, unique_key_id=None):
+        self.app_id = app_id
+        self.role = role
+        self.private_key = private_key
+        self.subscriber_id = app_id if subscriber_id is None else subscriber_id
+        self.unique_key_id = config.UNIQUE_KEY_ID if unique_key_id is None else unique_key_id
+
+    @property
+    def public_key(self):
+        return base64.b64decode(self.private_key)[32:]
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+class KeyRing:
+    def __init__(self, identities=()):
+        self._identities = {}
+        self._factories = {}
+        for identity in identities:
+            self.add(identity)
+
+    @classmethod
+    def default(cls):
+        """The collector from the environment and the receiver hard-coded in creds."""
+        ring = cls()
+        if config.SUBSCRIBER_ID and config.PRIVATE_KEY:
+            ring.add(Identity(config.SUBSCRIBER_ID, COLLECTOR, config.PRIVATE_KEY))
+        ring.add(Identity(RECEIVER_APP_ID, RECEIVER, BUYER_KEY))
+        return ring
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls(Identity(**entry) for entry in json.load(f))
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump([identity.to_dict() for identity in self], f, indent=2)
+
+    def generate(self, count, role=COLLECTOR, domain="loadtest.example.com"):
+        """Create `count` fresh identities named <role>-NNNN.<domain>, drawing all seeds at once."""
+        from nacl.bindings import crypto_sign_seed_keypair
+        seeds = os.urandom(32 * count)
+        start = sum(1 for identity in self if identity.role == role)
+        created = []
+        for i in range(count):
+            _, secret_key = crypto_sign_seed_keypair(seeds[32 * i:32 * (i + 1)])
+            number = start + i + 1
+            identity = Identity(f"{role}-{number:04d}.{domain}", role,
+                                base64.b64encode(secret_key).decode(),
+                                unique_key_id=f"{role}-{number:04d}-key")
+            self.add(identity)
+            created.append(identity)
+        return created
+
+    def add(self, identity):
+        self._identities[identity.app_id] = identity
+        self._factories.pop(identity.app_id, None)
+        register_public_key(identity.subscriber_id, identity.unique_key_id, identity.public_key)
+        return identity
+
+    def factory(self, app_id, **kwargs):
+        """Prepared HeaderFactory for app_id; kwargs (clock, expiry) bypass the cache."""
+        if kwargs:
+            identity = self._identities[app_id]
+            return HeaderFactory(identity.subscriber_id, identity.private_key, identity.unique_key_id, **kwargs)
+        factory = self._factories.get(app_id)
+        if factory is None:
+            identity = self._identities[app_id]
+            factory = HeaderFactory(identity.subscriber_id, identity.private_key, identity.unique_key_id)
+            self._factories[app_id] = factory
+        return factory
+
+    def headers(self, app_id, request_body, digest=None):
+        return self.factory(app_id).headers(request_body, digest)
+
+    def role(self, role):
+        return [identity for identity in self if identity.role == role]
+
+    def pairs(self):
+        """(collector, receiver) identities matched up in insertion order."""
+        return list(zip(self.role(COLLECTOR), self.role(RECEIVER)))
+
+    def __getitem__(self, app_id):
+        return self._identities[app_id]
+
+    def __contains__(self, app_id):
+        return app_id in self._identities
+
+    def __iter__(self):
+        return iter(self._identities.values())
+
+    def __len__(self):
+        return len(self._identities)
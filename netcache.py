@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""DNS and TLS session caching for gateway connections.
+
+DnsCache keeps resolved addresses for `ttl` seconds (getaddrinfo does not
+report the record's own TTL, so it is configured), and ResumingContext offers
+the last TLS session seen for a host when it opens the next connection, so a
+run pays for one lookup and one full handshake per host instead of one per
+connection. Connections try every cached address in order, as urllib3 does,
+and a host whose addresses all refuse is looked up afresh next time.
+"""
+import socket
+import ssl
+import threading
+import time
+
+class DnsCache:
+    def __init__(self, ttl=60.0, clock=time.monotonic):
+        self.ttl = ttl  # 0 resolves every time
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, host, port, family=0):
+        """(addresses, cached) for host in getaddrinfo order, looked up only when the cached entry is missing or expired."""
+        now = self.clock()
+        key = (host, port, family)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            self.hits += 1
+            return entry[1], True
+        addresses = list(dict.fromkeys(info[4][0] for info in socket.getaddrinfo(host, port, family, socket.SOCK_STREAM)))
+        with self._lock:
+            self.misses += 1
+            if self.ttl > 0:
+                self._entries[key] = (now + self.ttl, addresses)
+        return addresses, False
+
+    def evict(self, host, port, family=0):
+        """Forget host's addresses, e.g. once none of them accepts a connection."""
+        with self._lock:
+            self._entries.pop((host, port, family), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+def _session_key(sock, server_hostname=None):
+    # urllib3 passes no server_hostname for IP addresses; key those by peer address
+    return server_hostname or getattr(sock, "server_hostname", None) or sock.getpeername()[:2]
+
+class ResumingContext(ssl.SSLContext):
+    """Client SSLContext that resumes the last TLS session remembered for the same host."""
+
+    def __new__(cls, protocol=ssl.PROTOCOL_TLS_CLIENT, *args, **kwargs):
+        return super().__new__(cls, protocol, *args, **kwargs)
+
+    def __init__(self, protocol=ssl.PROTOCOL_TLS_CLIENT):
+        self.sessions = {}
+        self.offered = 0
+        self.resumed = 0
+
+    def wrap_socket(self, sock, *args, server_hostname=None, session=None, **kwargs):
+        if session is None:
+            session = self.sessions.get(_session_key(sock, server_hostname))
+        wrapped = super().wrap_socket(sock, *args, server_hostname=server_hostname, session=session, **kwargs)
+        if session is not None:
+            self.offered += 1
+            self.resumed += wrapped.session_reused
+        return wrapped
+
+    def remember(self, sock):
+        try:
+            session = sock.session
+            if session is not None:
+                self.sessions[_session_key(sock)] = session
+        except OSError:
+            pass  # already closed; the next connection does a full handshake
+
+def remember_session(sock):
+    """Keep sock's TLS session for the next connection; call once the server's session tickets have been read."""
+    if isinstance(sock, ssl.SSLSocket) and isinstance(sock.context, ResumingContext):
+        sock.context.remember(sock)
+
+def client_context(verify=True):
+    """ResumingContext set up like urllib3's default one, minus OP_NO_TICKET, for requests' `verify` value."""
+    import os
+    context = ResumingContext()
+    context.options |= ssl.OP_NO_COMPRESSION
+    context.post_handshake_auth = True
+    context.check_hostname = False  # urllib3 matches the hostname itself
+    if verify is False:
+        context.verify_mode = ssl.CERT_NONE
+    elif isinstance(verify, str):
+        if os.path.isdir(verify):
+            context.load_verify_locations(capath=verify)
+        else:
+            context.load_verify_locations(cafile=verify)
+    else:
+        from requests.utils import DEFAULT_CA_BUNDLE_PATH
+        context.load_verify_locations(cafile=DEFAULT_CA_BUNDLE_PATH)
+    return context
+
+def _gai_family():
+    # IPv4, IPv6 or both, as urllib3 would pass to getaddrinfo
+    from urllib3.util.connection import allowed_gai_family
+    return allowed_gai_family()
+
+def cached_connection(base, dns_cache):
+    """urllib3 connection class resolving through dns_cache and remembering TLS sessions."""
+    class CachedConnection(base):
+        def _resolve(self):
+            return dns_cache.resolve(self._dns_host, self.port, _gai_family())
+
+        def _new_conn(self):
+            from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+            try:
+                addresses, _ = self._resolve()
+            except OSError:
+                return super()._new_conn()  # let urllib3 raise its usual NewConnectionError
+            # connect straight to the resolved addresses; `host` (SNI, Host header) is untouched
+            host = self._dns_host
+            try:
+                for address in addresses[:-1]:
+                    self._dns_host = address
+                    try:
+                        return super()._new_conn()
+                    except (NewConnectionError, ConnectTimeoutError):
+                        pass  # next address, as urllib3's create_connection does
+                self._dns_host = addresses[-1]
+                try:
+                    return super()._new_conn()
+                except (NewConnectionError, ConnectTimeoutError):
+                    dns_cache.evict(host, self.port, _gai_family())
+                    raise
+            finally:
+                self._dns_host = host
+
+        def getresponse(self, *args, **kwargs):
+            sock = self.sock  # http.client drops it here when the server closes the connection
+            response = super().getresponse(*args, **kwargs)
+            remember_session(sock)  # TLS 1.3 tickets arrive after the handshake, before the response
+            return response
+
+    CachedConnection.__name__ = "Cached" + base.__name__
+    return CachedConnection
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 import json
-import requests
+from retry import RetryPolicy, post_with_retry
+from reply import Reply
 import time
 import uuid
 
@@ -85,16 +86,10 @@ def test_collector_settlement():
     headers = get_headers(request_body_raw_text)
     
     try:
-        response = requests.post(
-            SETTLE_ENDPOINT,
-            headers=headers,
-            data=request_body_raw_text,
-            timeout=30
-        )
+        response = post_with_retry(SETTLE_ENDPOINT, request_body_raw_text, headers, RetryPolicy())
         
         print(f"Status: {response.status_code}")
-        print("Response:")
-        print(json.dumps(response.json(), indent=2))
+        Reply(response).log("Response:\n")
         
         if response.status_code == 200:
             print("\n✅ Collector settlement successful!")
@@ -178,16 +173,10 @@ def test_receiver_settlement(transaction_id, message_id_2):
     headers = get_headers(request_body_raw_text)
     
     try:
-        response = requests.post(
-            SETTLE_ENDPOINT,
-            headers=headers,
-            data=request_body_raw_text,
-            timeout=30
-        )
+        response = post_with_retry(SETTLE_ENDPOINT, request_body_raw_text, headers, RetryPolicy())
         
         print(f"Status: {response.status_code}")
-        print("Response:")
-        print(json.dumps(response.json(), indent=2))
+        Reply(response).log("Response:\n")
         
         if response.status_code == 200:
             print("\n✅ Receiver (LSP) settlement successful!")
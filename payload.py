@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""Typed /settle payloads built from compact __slots__ classes.
+
+Each class writes itself straight to the minified JSON the scenarios produce
+with json.dumps(payload, separators=(',', ':')): same key order, same
+escaping (ASCII, like json.dumps' default), no intermediate dicts. Optional
+fields left as None are omitted. to_dict() gives the equivalent nested dicts.
+For bulk runs ContextTemplate serializes the invariant part of the context once.
+
+    payload = SettlePayload(
+        Context("settle", transaction_id, message_id),
+        COLLECTOR_APP_ID, RECEIVER_APP_ID,
+        Settlement("NP-NP", settlement_id, [
+            Order(order_id,
+                  inter_participant=Party(Amount("1000.00")),
+                  collector=Party(Amount("50.00")),
+                  provider=Party(Amount("800.00"), provider_id, "Test Provider",
+                                 BankDetails("1234567890", "IFSC0001")),
+                  self_party=Party(Amount("200.00")))]))
+    body = Body.from_payload(payload)
+"""
+import json
+from datetime import datetime, timezone
+from json.encoder import encode_basestring_ascii as _s
+
+from amounts import format_paise, to_paise
+from creds import BPP_ID, BPP_URI, config
+
+def utc_timestamp():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+def _dump(value):
+    if value.__class__ is str:
+        return _s(value)
+    if isinstance(value, (list, tuple)):
+        return "[" + ",".join([_dump(item) for item in value]) + "]"
+    to_json = getattr(value, "to_json", None)
+    if to_json is not None:
+        return to_json()
+    return json.dumps(value, separators=(',', ':'))
+
+def _scalar(value):
+    return _s(value) if value.__class__ is str else _dump(value)
+
+def _plain(value):
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    return value.to_dict() if hasattr(value, "to_dict") else value
+
+def _object(fields):
+    return "{" + ",".join([f"{_s(key)}:{_dump(value)}" for key, value in fields if value is not None]) + "}"
+
+def _dict(fields):
+    return {key: _plain(value) for key, value in fields if value is not None}
+
+class Amount:
+    __slots__ = ("value", "currency")
+
+    def __init__(self, value, currency="INR"):
+        self.value = value
+        self.currency = currency
+
+    @classmethod
+    def from_paise(cls, paise, currency="INR", decimals=2):
+        """Amount.from_paise(100050).value == "1000.50"; decimals=0 gives the integer form ("1000")."""
+        return cls(format_paise(paise, decimals), currency)
+
+    @property
+    def paise(self):
+        if isinstance(self.value, float):  # 1000.5 -> "1000.5"; floats with more than two decimals are a ValueError
+            return to_paise(str(self.value))
+        return to_paise(self.value)
+
+    def to_json(self):
+        return f'{{"currency":{_scalar(self.currency)},"value":{_scalar(self.value)}}}'
+
+    def to_dict(self):
+        return {"currency": self.currency, "value": self.value}
+
+class BankDetails:
+    __slots__ = ("account_no", "ifsc_code")
+
+    def __init__(self, account_no, ifsc_code):
+        self.account_no = account_no
+        self.ifsc_code = ifsc_code
+
+    def to_json(self):
+        return f'{{"account_no":{_scalar(self.account_no)},"ifsc_code":{_scalar(self.ifsc_code)}}}'
+
+    def to_dict(self):
+        return {"account_no": self.account_no, "ifsc_code": self.ifsc_code}
+
+class Party:
+    """One share of an order: inter_participant, collector, provider or self."""
+    __slots__ = ("amount", "id", "name", "bank_details")
+
+    def __init__(self, amount, id=None, name=None, bank_details=None):
+        self.amount = amount
+        self.id = id
+        self.name = name
+        self.bank_details = bank_details
+
+    def _fields(self):
+        return (("id", self.id), ("name", self.name), ("bank_details", self.bank_details), ("amount", self.amount))
+
+    def to_json(self):
+        if self.id is None and self.name is None and self.bank_details is None and self.amount is not None:
+            return f'{{"amount":{self.amount.to_json()}}}'
+        if self.id is None or self.name is None or self.bank_details is None or self.amount is None:
+            return _object(self._fields())
+        return (f'{{"id":{_scalar(self.id)},"name":{_scalar(self.name)},"bank_details":{self.bank_details.to_json()},'
+                f'"amount":{self.amount.to_json()}}}')
+
+    def to_dict(self):
+        return _dict(self._fields())
+
+class Order:
+    __slots__ = ("id", "inter_participant", "collector", "provider", "self_party")
+
+    def __init__(self, id, inter_participant=None, collector=None, provider=None, self_party=None):
+        self.id = id
+        self.inter_participant = inter_participant
+        self.collector = collector
+        self.provider = provider
+        self.self_party = self_party  # the "self" key
+
+    def _fields(self):
+        return (("id", self.id), ("inter_participant", self.inter_participant), ("collector", self.collector),
+                ("provider", self.provider), ("self", self.self_party))
+
+    def to_json(self):
+        if (self.id is None or self.inter_participant is None or self.collector is None or self.provider is None
+                or self.self_party is None):
+            return _object(self._fields())
+        return (f'{{"id":{_scalar(self.id)},"inter_participant":{self.inter_participant.to_json()},'
+                f'"collector":{self.collector.to_json()},"provider":{self.provider.to_json()},'
+                f'"self":{self.self_party.to_json()}}}')
+
+    def to_dict(self):
+        return _dict(self._fields())
+
+class Settlement:
+    __slots__ = ("type", "id", "orders")
+
+    def __init__(self, type, id=None, orders=None):
+        self.type = type
+        self.id = id
+        self.orders = orders
+
+    def _fields(self):
+        return ("type", self.type), ("id", self.id), ("orders", self.orders)
+
+    def to_json(self):
+        return _object(self._fields())
+
+    def to_dict(self):
+        return _dict(self._fields())
+
+class Context:
+    __slots__ = ("action", "transaction_id", "message_id", "timestamp", "domain", "country", "city", "version",
+                 "bap_id", "bap_uri", "bpp_id", "bpp_uri", "ttl")
+
+    def __init__(self, action, transaction_id, message_id, timestamp=None, domain="ONDC:NTS10", country="IND",
+                 city="*", version="2.0.0", bap_id=None, bap_uri=None, bpp_id=BPP_ID, bpp_uri=BPP_URI, ttl="P1D"):
+        """bap_id/bap_uri default to the configured ones, timestamp to now."""
+        self.action = action
+        self.transaction_id = transaction_id
+        self.message_id = message_id
+        self.timestamp = utc_timestamp() if timestamp is None else timestamp
+        self.domain = domain
+        self.country = country
+        self.city = city
+        self.version = version
+        self.bap_id = config.BAP_ID if bap_id is None else bap_id
+        self.bap_uri = config.BAP_URI if bap_uri is None else bap_uri
+        self.bpp_id = bpp_id
+        self.bpp_uri = bpp_uri
+        self.ttl = ttl
+
+    def to_json(self):
+        return (f'{{"domain":{_scalar(self.domain)},'
+                f'"location":{{"country":{{"code":{_scalar(self.country)}}},"city":{{"code":{_scalar(self.city)}}}}},'
+                f'"version":{_scalar(self.version)},"action":{_scalar(self.action)},'
+                f'"bap_id":{_scalar(self.bap_id)},"bap_uri":{_scalar(self.bap_uri)},'
+                f'"bpp_id":{_scalar(self.bpp_id)},"bpp_uri":{_scalar(self.bpp_uri)},'
+                f'"transaction_id":{_scalar(self.transaction_id)},"message_id":{_scalar(self.message_id)},'
+                f'"timestamp":{_scalar(self.timestamp)},"ttl":{_scalar(self.ttl)}}}')
+
+    def to_dict(self):
+        return {
+            "domain": self.domain,
+            "location": {"country": {"code": self.country}, "city": {"code": self.city}},
+            "version": self.version,
+            "action": self.action,
+            "bap_id": self.bap_id,
+            "bap_uri": self.bap_uri,
+            "bpp_id": self.bpp_id,
+            "bpp_uri": self.bpp_uri,
+            "transaction_id": self.transaction_id,
+            "message_id": self.message_id,
+            "timestamp": self.timestamp,
+            "ttl": self.ttl
+        }
+
+class ContextTemplate:
+    """Context serialized once; only action, transaction_id, message_id and timestamp are spliced in per message.
+
+    The invariant part is written by Context.to_json itself, so the result is
+    byte-identical to it and to json.dumps of the equivalent dict. Takes the
+    same keyword arguments as Context for the invariant fields.
+    """
+    __slots__ = ("base", "_parts")
+
+    SPLICED = ("action", "transaction_id", "message_id", "timestamp")
+
+    def __init__(self, **fields):
+        markers = [f"\x00{name}\x00" for name in self.SPLICED]  # cannot survive escaping unchanged, so cannot clash
+        self.base = Context(*markers, **fields)
+        rest = self.base.to_json()
+        parts = []
+        for marker in markers:
+            head, rest = rest.split(_s(marker), 1)
+            parts.append(head)
+        parts.append(rest)
+        self._parts = tuple(parts)
+
+    def render(self, action, transaction_id, message_id, timestamp=None):
+        """Context JSON text for one message."""
+        parts = self._parts
+        timestamp = utc_timestamp() if timestamp is None else timestamp
+        return (f"{parts[0]}{_scalar(action)}{parts[1]}{_scalar(transaction_id)}{parts[2]}{_scalar(message_id)}"
+                f"{parts[3]}{_scalar(timestamp)}{parts[4]}")
+
+    def render_bytes(self, action, transaction_id, message_id, timestamp=None):
+        # escaped JSON is pure ASCII; one encode of the spliced text is cheaper than joining encoded pieces
+        return self.render(action, transaction_id, message_id, timestamp).encode('ascii')
+
+    def context(self, action, transaction_id, message_id, timestamp=None):
+        """A context object for SettlePayload that serializes through this template."""
+        return SplicedContext(self, action, transaction_id, message_id,
+                              utc_timestamp() if timestamp is None else timestamp)
+
+class SplicedContext:
+    __slots__ = ("template", "action", "transaction_id", "message_id", "timestamp")
+
+    def __init__(self, template, action, transaction_id, message_id, timestamp):
+        self.template = template
+        self.action = action
+        self.transaction_id = transaction_id
+        self.message_id = message_id
+        self.timestamp = timestamp
+
+    def to_json(self):
+        return self.template.render(self.action, self.transaction_id, self.message_id, self.timestamp)
+
+    def to_dict(self):
+        fields = self.template.base.to_dict()
+        fields.update(action=self.action, transaction_id=self.transaction_id, message_id=self.message_id,
+                      timestamp=self.timestamp)
+        return fields
+
+class SettlePayload:
+    """Complete /settle request: context plus the collector, receiver and settlement message."""
+    __slots__ = ("context", "collector_app_id", "receiver_app_id", "settlement")
+
+    def __init__(self, context, collector_app_id, receiver_app_id, settlement):
+        self.context = context
+        self.collector_app_id = collector_app_id
+        self.receiver_app_id = receiver_app_id
+        self.settlement = settlement
+
+    def _message(self):
+        return (("collector_app_id", self.collector_app_id), ("receiver_app_id", self.receiver_app_id),
+                ("settlement", self.settlement))
+
+    def to_json(self):
+        return f'{{"context":{self.context.to_json()},"message":{_object(self._message())}}}'
+
+    def to_dict(self):
+        return {"context": self.context.to_dict(), "message": _dict(self._message())}
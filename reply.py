@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Gateway replies kept as the raw bytes they arrived in.
+
+The scenarios only print a reply and look at a few fields, so Reply logs the
+raw body as-is and parses it once, on the first field access, instead of
+json() followed by json.dumps() for every response.
+"""
+import json
+import sys
+
+_UNPARSED = object()
+
+class Reply:
+    __slots__ = ("status_code", "raw", "_parsed")
+
+    def __init__(self, response):
+        self.status_code = response.status_code
+        self.raw = response.content
+        self._parsed = _UNPARSED
+
+    def parsed(self):
+        """The decoded JSON body, or None if it is not JSON; decoded at most once."""
+        if self._parsed is _UNPARSED:
+            try:
+                self._parsed = json.loads(self.raw)
+            except ValueError:
+                self._parsed = None
+        return self._parsed
+
+    def get(self, *path):
+        """Nested field by keys, e.g. get("error", "code"); None when any step is missing."""
+        value = self.parsed()
+        for key in path:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        return value
+
+    @property
+    def ack_status(self):
+        return self.get("message", "ack", "status")
+
+    @property
+    def acked(self):
+        return self.status_code == 200 and self.ack_status == "ACK"
+
+    @property
+    def error_code(self):
+        return self.get("error", "code")
+
+    @property
+    def error_message(self):
+        return self.get("error", "message")
+
+    @property
+    def reference(self):
+        """(transaction_id, message_id) the reply refers to, when it echoes a context."""
+        context = self.get("context")
+        if not isinstance(context, dict):
+            return None
+        return context.get("transaction_id"), context.get("message_id")
+
+    @property
+    def text(self):
+        return self.raw.decode("utf-8", "replace")
+
+    def log(self, prefix="Response: ", stream=None):
+        """Write prefix and the raw body to stream (stdout) without decoding or re-encoding it."""
+        stream = stream or sys.stdout
+        buffer = getattr(stream, "buffer", None)
+        if buffer is None:
+            stream.write(prefix + self.text + "\n")
+            return
+        stream.flush()  # keep ordering with earlier print() output
+        buffer.write(prefix.encode("utf-8") + self.raw + b"\n")
+        if getattr(stream, "line_buffering", False):
+            buffer.flush()  # same as print() on a terminal
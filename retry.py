@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Retries for signed gateway calls.
+
+Each attempt gets a fresh created/expires window and signature, so a retry is
+never rejected for carrying the previous attempt's (possibly expired) header.
+Backoff is exponential with full jitter or the server's Retry-After, connect
+and read timeouts are separate, and the whole call is bounded by a total
+deadline. /settle is not idempotent, so it is only resent when the gateway
+cannot have processed it.
+"""
+import logging
+import random
+import time
+from urllib.parse import urlsplit
+
+from body import Body
+from creds import header_factory
+from transport import get_transport, network_errors
+
+log = logging.getLogger(__name__)
+
+RETRY_STATUS = (429, 500, 502, 503, 504)
+# Answers meaning the gateway turned the request away unprocessed, so even /settle can be resent
+UNPROCESSED_STATUS = (429, 503)
+# A resent /settle after a read timeout or 5xx may settle twice: only connect failures and
+# UNPROCESSED_STATUS are retried for these paths unless the policy has retry_unsafe set
+UNSAFE_PATHS = ("/settle",)
+
+class RetryPolicy:
+    def __init__(self, attempts=4, backoff=0.5, max_backoff=8.0, connect_timeout=5.0,
+                 read_timeout=30.0, deadline=60.0, retry_status=RETRY_STATUS, rng=None, retry_unsafe=False):
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.deadline = deadline
+        self.retry_status = retry_status
+        self.rng = rng or random.Random()
+        self.retry_unsafe = retry_unsafe
+
+    def delay(self, attempt):
+        """Full-jitter backoff before retry number `attempt` (1-based)."""
+        return self.rng.uniform(0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+
+def retry_after(response):
+    """Seconds a 429/503 asked us to wait (Retry-After as seconds or an HTTP date), or None."""
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime  # costs ~20 ms at import, and dates are rare here
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+def connect_failure(error):
+    """True when the request cannot have reached the server: no connection was ever established."""
+    import requests
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    if isinstance(error, requests.ConnectionError):
+        from urllib3.exceptions import NewConnectionError
+        reason = getattr(error.args[0], "reason", None) if error.args else None
+        return isinstance(reason, NewConnectionError)
+    try:
+        import httpx
+    except ImportError:
+        return False
+    return isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout))
+
+def _retry(url, send, policy):
+    # send(timeout) makes one attempt; returns the last response or raises the last network error
+    policy = policy or RetryPolicy()
+    unsafe = not policy.retry_unsafe and urlsplit(url).path.endswith(UNSAFE_PATHS)
+    retry_status = tuple(s for s in policy.retry_status if s in UNPROCESSED_STATUS) if unsafe else policy.retry_status
+    give_up_at = time.monotonic() + policy.deadline
+    attempt = 0
+    while True:
+        attempt += 1
+        remaining = give_up_at - time.monotonic()
+        timeout = (min(policy.connect_timeout, remaining), min(policy.read_timeout, remaining))
+        wait = None
+        try:
+            response = send(timeout)
+            if response.status_code not in retry_status:
+                return response
+            failure = f"HTTP {response.status_code}"
+            wait = retry_after(response)
+        except network_errors() as e:
+            if unsafe and not connect_failure(e):
+                log.warning("%s: not resending after %s, the gateway may already have the request",
+                            url, type(e).__name__)
+                raise
+            response = None
+            failure = f"{type(e).__name__}: {e}"
+            error = e
+        if wait is None:
+            wait = policy.delay(attempt)
+        # a Retry-After past the deadline ends the call rather than being cut short
+        if attempt >= policy.attempts or time.monotonic() + wait >= give_up_at:
+            log.warning("%s failed after %d attempt(s): %s", url, attempt, failure)
+            if response is not None:
+                return response
+            raise error
+        log.info("%s attempt %d failed (%s), retrying in %.2fs", url, attempt, failure, wait)
+        time.sleep(wait)
+
+def send_with_retry(url, body, factory, policy=None, transport=None):
+    """POST a Body signed by `factory`, re-signing before every attempt."""
+    transport = transport or get_transport()
+
+    def send(timeout):
+        headers = factory.headers(body.data, digest=body.digest)
+        return transport.post(url, data=body.data, headers=headers, timeout=timeout)
+
+    return _retry(url, send, policy)
+
+def post_with_retry(url, data, headers, policy=None, transport=None):
+    """Retrying transport.post with fixed headers, for scenarios that send a deliberately bad or missing signature."""
+    transport = transport or get_transport()
+    return _retry(url, lambda timeout: transport.post(url, data=data, headers=headers, timeout=timeout), policy)
+
+def post_signed(url, request_body, SUBSCRIBER_ID, KEY, policy=None, transport=None):
+    """Retrying counterpart of transport.post(url, data=request_body, headers=get_headers(...))."""
+    if not isinstance(request_body, Body):
+        if isinstance(request_body, str):
+            request_body = request_body.encode('utf-8')
+        request_body = Body(request_body)
+    return send_with_retry(url, request_body, header_factory(SUBSCRIBER_ID, KEY), policy, transport)
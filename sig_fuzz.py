@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""Mutation engine for negative signature scenarios.
+
+TC_02 and TC_03 each send one broken Authorization header to the gateway. This
+generates many malformed variants from the `creds` signing primitives and
+classifies them locally with verify_authorisation_header, so the 70000
+(Invalid Signature) path can be covered without spending gateway calls.
+
+Usage: python sig_fuzz.py [count] [seed]
+"""
+import base64
+import json
+import random
+import sys
+import time
+from collections import Counter
+
+from creds import RECEIVER_APP_ID, SignatureError, hash_message, verify_authorisation_header
+from key_ring import KeyRing
+
+ACCEPTED = "accepted"
+_ARABIC_INDIC = str.maketrans("0123456789", "\u0660\u0661\u0662\u0663\u0664\u0665\u0666\u0667\u0668\u0669")
+
+def format_header(key_id, created, expires, signature, algorithm="ed25519", headers="(created) (expires) digest"):
+    return (f'Signature keyId="{key_id}",algorithm="{algorithm}",created="{created}",'
+            f'expires="{expires}",headers="{headers}",signature="{signature}"')
+
+class SignatureFuzzer:
+    def __init__(self, factory, request_body, seed=None, clock=time.time):
+        self.factory = factory
+        self.body = request_body
+        self.rng = random.Random(seed)
+        self.clock = clock
+        self.digest = hash_message(request_body)
+        self.key_id = f"{factory.subscriber_id}|{factory.unique_key_id}|ed25519"
+        self.mutations = {name[len("mutate_"):]: getattr(self, name)
+                          for name in sorted(dir(self)) if name.startswith("mutate_")}
+
+    def _window(self):
+        created = int(self.now)
+        return created, created + self.factory.expiry
+
+    def _sign(self, created, expires, digest=None):
+        digest = self.digest if digest is None else digest
+        return self.factory.signature(f"(created): {created}\n(expires): {expires}\ndigest: BLAKE-512={digest}")
+
+    def _valid(self, key_id=None, created=None, expires=None, **fields):
+        if created is None:
+            created, expires = self._window()
+        signature = self._sign(created, expires)
+        return format_header(key_id or self.key_id, created, expires, signature, **fields)
+
+    # keyId
+    def mutate_key_id_subscriber(self):
+        return self._valid(key_id=f"invalid-{self.rng.randrange(10**6)}.samhita.org|{self.factory.unique_key_id}|ed25519")
+
+    def mutate_key_id_unique_key(self):
+        return self._valid(key_id=f"{self.factory.subscriber_id}|wrong-key-{self.rng.randrange(10**6)}|ed25519")
+
+    def mutate_key_id_algorithm(self):
+        return self._valid(key_id=f"{self.factory.subscriber_id}|{self.factory.unique_key_id}|{self.rng.choice(['rsa', 'ED25519', ''])}")
+
+    def mutate_key_id_parts(self):
+        parts = self.key_id.split("|")
+        if self.rng.random() < 0.5:
+            del parts[self.rng.randrange(len(parts))]
+        else:
+            parts.insert(self.rng.randrange(len(parts) + 1), "extra")
+        return self._valid(key_id="|".join(parts))
+
+    # created / expires
+    def mutate_expired(self):
+        expires = int(self.now) - self.rng.randint(1, 86400)
+        return self._valid(created=expires - self.factory.expiry, expires=expires)
+
+    def mutate_created_in_future(self):
+        created = int(self.now) + self.rng.randint(1, 86400)
+        return self._valid(created=created, expires=created + self.factory.expiry)
+
+    def mutate_created_after_expires(self):
+        created, expires = self._window()
+        return self._valid(created=expires + self.rng.randint(1, 3600), expires=expires)
+
+    def mutate_timestamp_not_numeric(self):
+        created, expires = self._window()
+        bad = self.rng.choice(["", "abc", f"{created}.5", f"-{created}", f"{created} ", f"\u00b2{created}",
+                               str(created).translate(_ARABIC_INDIC)])
+        if self.rng.random() < 0.5:
+            return self._valid(created=bad, expires=expires)
+        return self._valid(created=created, expires=bad)
+
+    # signature
+    def mutate_signature_truncated(self):
+        created, expires = self._window()
+        signature = self._sign(created, expires)
+        return format_header(self.key_id, created, expires, signature[:self.rng.randrange(len(signature))])
+
+    def mutate_signature_bit_flip(self):
+        created, expires = self._window()
+        raw = bytearray(base64.b64decode(self._sign(created, expires)))
+        raw[self.rng.randrange(len(raw))] ^= 1 << self.rng.randrange(8)
+        return format_header(self.key_id, created, expires, base64.b64encode(raw).decode())
+
+    def mutate_signature_not_base64(self):
+        created, expires = self._window()
+        signature = list(self._sign(created, expires))
+        signature[self.rng.randrange(len(signature) - 2)] = self.rng.choice("*-_!")
+        return format_header(self.key_id, created, expires, "".join(signature))
+
+    # digest / signing string
+    def mutate_digest_of_other_body(self):
+        created, expires = self._window()
+        other = hash_message(self.body + " " * self.rng.randint(1, 4))
+        return format_header(self.key_id, created, expires, self._sign(created, expires, digest=other))
+
+    def mutate_signing_string_whitespace(self):
+        # TC_02's triple-quoted signing string keeps the source indentation
+        created, expires = self._window()
+        indent = " " * self.rng.choice([4, 8, 24])
+        signature = self.factory.signature(f"(created): {created}\n{indent}(expires): {expires}\n{indent}digest: BLAKE-512={self.digest}")
+        return format_header(self.key_id, created, expires, signature)
+
+    # header parameters and syntax
+    def mutate_algorithm_param(self):
+        return self._valid(algorithm=self.rng.choice(["rsa-sha256", "ED25519", "hs2019", ""]))
+
+    def mutate_headers_param(self):
+        return self._valid(headers=self.rng.choice(["(created) digest", "(expires) (created) digest", "digest", ""]))
+
+    def mutate_missing_param(self):
+        params = self._valid()[len("Signature "):].split(",")
+        del params[self.rng.randrange(len(params))]
+        return "Signature " + ",".join(params)
+
+    def mutate_syntax(self):
+        header = self._valid()
+        return self.rng.choice([
+            header.replace(",", ", "),
+            header.replace("Signature ", "signature "),
+            header.replace('"', "'"),
+            header[:self.rng.randrange(len(header))],
+            "",
+        ])
+
+    def run(self, count):
+        """Generate and verify `count` mutants; returns Counter of (mutation, reason or "accepted")."""
+        results = Counter()
+        names = list(self.mutations)
+        for _ in range(count):
+            self.now = self.clock()
+            name = self.rng.choice(names)
+            header = self.mutations[name]()
+            try:
+                verify_authorisation_header(header, self.body, now=int(self.now))
+                results[name, ACCEPTED] += 1
+            except SignatureError as e:
+                results[name, e.args[0]] += 1
+        return results
+
+def sample_body():
+    payload = {
+        "context": {"domain": "ONDC:NTS10", "action": "settle", "ttl": "P1D"},
+        "message": {"receiver_app_id": RECEIVER_APP_ID, "settlement": {"type": "NIL"}}
+    }
+    return json.dumps(payload, separators=(',', ':'))
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    factory = KeyRing.default().factory(RECEIVER_APP_ID)
+    fuzzer = SignatureFuzzer(factory, sample_body(), seed=seed)
+
+    start = time.perf_counter()
+    results = fuzzer.run(count)
+    elapsed = time.perf_counter() - start
+
+    by_mutation = {}
+    for (name, reason), n in sorted(results.items()):
+        by_mutation.setdefault(name, []).append(f"{reason}={n}")
+    for name, reasons in by_mutation.items():
+        print(f"{name:26} {' '.join(reasons)}")
+    escaped = sum(n for (_, reason), n in results.items() if reason == ACCEPTED)
+    print(f"{count} mutants in {elapsed:.2f}s ({count / elapsed:,.0f}/s), {escaped} accepted")
+    if escaped:
+        sys.exit(1)
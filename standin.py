@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""Local stand-in for the NOCS gateway.
+
+Serves /nocs/v2/settle and /nocs/v2/report with a fixed number of concurrent
+workers (`capacity`) and a bounded wait queue; requests beyond that get 429.
+A `slow_rate` fraction of requests takes `slow_time` instead of `service_time`, to
+give the latency distribution a tail. Optionally checks signatures with creds.verify_authorisation_header and NACKs
+with 70000 like the real gateway. With an ssl_context it serves HTTPS, and with
+http2=True it also speaks HTTP/2 to clients that negotiate h2 over ALPN
+(needs the `h2` package).
+
+Usage: python standin.py [port] [capacity]
+"""
+import json
+import os
+import random
+import select
+import socket
+import ssl
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from queue import SimpleQueue
+
+from creds import SignatureError, verify_authorisation_header
+from key_ring import KeyRing
+
+ACK = json.dumps({"message": {"ack": {"status": "ACK"}}}, separators=(',', ':')).encode('utf-8')
+
+def nack(code, message):
+    return json.dumps({"message": {"ack": {"status": "NACK"}}, "error": {"code": code, "message": message}},
+                      separators=(',', ':')).encode('utf-8')
+
+def self_signed_context(http2=False):
+    """Server SSLContext with a fresh localhost certificate, and the path of that certificate for clients."""
+    import datetime
+    import ipaddress
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (x509.CertificateBuilder()
+                   .subject_name(name).issuer_name(name)
+                   .public_key(key.public_key())
+                   .serial_number(x509.random_serial_number())
+                   .not_valid_before(now - datetime.timedelta(minutes=5))
+                   .not_valid_after(now + datetime.timedelta(days=1))
+                   .add_extension(x509.SubjectAlternativeName([
+                       x509.DNSName("localhost"), x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]), critical=False)
+                   .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+                   .sign(key, hashes.SHA256()))
+    directory = tempfile.mkdtemp(prefix="nocs-standin-")
+    cert_path = os.path.join(directory, "cert.pem")
+    key_path = os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(certificate.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                  serialization.NoEncryption()))
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert_path, key_path)
+    context.set_alpn_protocols(["h2", "http/1.1"] if http2 else ["http/1.1"])
+    return context, cert_path
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def finish_request(self, request, client_address):
+        alpn = getattr(request, "selected_alpn_protocol", lambda: None)()
+        if alpn == "h2":
+            self.gateway.serve_h2(request)
+        else:
+            super().finish_request(request, client_address)
+
+class StandInGateway:
+    def __init__(self, capacity=16, service_time=0.02, queue=None, verify=False,
+                 host="127.0.0.1", port=0, ssl_context=None, slow_rate=0.0, slow_time=1.0, seed=None):
+        self.capacity = capacity
+        self.service_time = service_time
+        self.slow_rate = slow_rate
+        self.slow_time = slow_time
+        self._rng = random.Random(seed)
+        self.queue = capacity if queue is None else queue
+        self.verify = verify
+        self.ssl_context = ssl_context
+        self.stats = {"requests": 0, "ack": 0, "nack": 0, "rejected": 0, "max_concurrent": 0,
+                      "connections": 0, "h2_connections": 0}
+        self._workers = threading.BoundedSemaphore(capacity)
+        self._admission = threading.BoundedSemaphore(capacity + self.queue)
+        self._lock = threading.Lock()
+        self._active = 0
+        self.server = _Server((host, port), self._handler())
+        self.server.gateway = self
+        if ssl_context is not None:
+            self.server.socket = ssl_context.wrap_socket(self.server.socket, server_side=True)
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"{'https' if self.ssl_context else 'http'}://{host}:{port}"
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _handler(self):
+        gateway = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                gateway._count("connections")
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                status, reply = gateway.handle(self.path, self.headers.get("Authorization"), body)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(reply)))
+                if self.close_connection:  # client sent Connection: close; say so, as real servers do
+                    self.send_header("Connection", "close")
+                self.end_headers()
+                self.wfile.write(reply)
+
+            def do_HEAD(self):  # warm-up probes: no body, nothing counted
+                self.send_response(405)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def handle(self, path, authorization, body):
+        self._count("requests")
+        if not path.endswith(("/settle", "/report")):
+            return 404, nack("404", "Not Found")
+        if not self._admission.acquire(blocking=False):
+            self._count("rejected")
+            return 429, nack("429", "Too Many Requests")
+        try:
+            with self._workers:
+                with self._lock:
+                    self._active += 1
+                    self.stats["max_concurrent"] = max(self.stats["max_concurrent"], self._active)
+                try:
+                    if self.verify:
+                        try:
+                            verify_authorisation_header(authorization, body)
+                        except SignatureError as e:
+                            self._count("nack")
+                            return 401, nack("70000", f"Invalid Signature ({e.args[0]})")
+                    slow = self.slow_rate and self._rng.random() < self.slow_rate
+                    time.sleep(self.slow_time if slow else self.service_time)
+                    self._count("ack")
+                    return 200, ACK
+                finally:
+                    with self._lock:
+                        self._active -= 1
+        finally:
+            self._admission.release()
+
+    def serve_h2(self, sock):
+        """Serve one HTTP/2 connection; each stream is handled on its own thread, all socket I/O stays here."""
+        import h2.config
+        import h2.connection
+        import h2.events
+        self._count("connections")
+        self._count("h2_connections")
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False, header_encoding="utf-8"))
+        conn.initiate_connection()
+        sock.sendall(conn.data_to_send())
+        replies = SimpleQueue()
+        wake_r, wake_w = socket.socketpair()
+        streams = {}
+
+        def respond(stream_id, headers, body):
+            replies.put((stream_id, *self.handle(headers.get(":path", ""), headers.get("authorization"), body)))
+            wake_w.send(b"\0")
+
+        try:
+            while True:
+                readable = [sock] if sock.pending() else select.select([sock, wake_r], [], [])[0]
+                if wake_r in readable:
+                    wake_r.recv(4096)
+                    while not replies.empty():
+                        stream_id, status, reply = replies.get()
+                        conn.send_headers(stream_id, [(":status", str(status)), ("content-type", "application/json"),
+                                                      ("content-length", str(len(reply)))])
+                        conn.send_data(stream_id, reply, end_stream=True)
+                if sock in readable:
+                    data = sock.recv(65535)
+                    if not data:
+                        break
+                    for event in conn.receive_data(data):
+                        if isinstance(event, h2.events.RequestReceived):
+                            streams[event.stream_id] = (dict(event.headers), bytearray())
+                        elif isinstance(event, h2.events.DataReceived):
+                            streams[event.stream_id][1].extend(event.data)
+                            conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                        elif isinstance(event, h2.events.StreamEnded):
+                            headers, body = streams.pop(event.stream_id)
+                            if headers.get(":method") == "HEAD":
+                                conn.send_headers(event.stream_id, [(":status", "405"), ("content-length", "0")],
+                                                  end_stream=True)
+                                continue
+                            threading.Thread(target=respond, args=(event.stream_id, headers, bytes(body)),
+                                             daemon=True).start()
+                        elif isinstance(event, h2.events.ConnectionTerminated):
+                            return
+                outgoing = conn.data_to_send()
+                if outgoing:
+                    sock.sendall(outgoing)
+        except (OSError, ssl.SSLError):
+            pass  # client went away
+        finally:
+            wake_r.close()
+            wake_w.close()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8080
+    capacity = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    KeyRing.default()  # registers the env collector and BUYER_KEY receiver public keys
+    gateway = StandInGateway(capacity=capacity, port=port, verify=True)
+    print(f"Stand-in gateway on {gateway.url}/nocs/v2/settle (capacity {capacity})")
+    try:
+        gateway.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
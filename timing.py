@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""Per-phase request timings for the shared transport.
+
+Instrumented urllib3 connections record DNS resolution, TCP connect, TLS
+handshake, request write, time to first byte and body read for each call made
+while a TimingRecord is active on the current thread, along with whether the
+lookup came from the DNS cache and the TLS session was resumed. Records are
+tagged with scenario, endpoint, transaction_id and message_id and can be
+summarised at the end of a run. Http2Transport fills the same records from
+httpx's trace hook, with DNS counted as part of connect.
+"""
+import os
+import re
+import sys
+import threading
+import time
+
+PHASES = ("dns", "connect", "tls", "write", "ttfb", "body")
+
+_TXN_ID = re.compile(rb'"transaction_id":\s*"([^"]*)"')
+_MSG_ID = re.compile(rb'"message_id":\s*"([^"]*)"')
+
+_local = threading.local()
+_records = []
+_records_lock = threading.Lock()
+
+class TimingRecord:
+    __slots__ = ("scenario", "endpoint", "transaction_id", "message_id", "status", "reused", "dns_cached", "resumed",
+                 "total") + PHASES
+
+    def __init__(self, scenario, endpoint, transaction_id=None, message_id=None):
+        self.scenario = scenario
+        self.endpoint = endpoint
+        self.transaction_id = transaction_id
+        self.message_id = message_id
+        self.status = None
+        self.reused = True  # until a new connection is opened for this request
+        self.dns_cached = False
+        self.resumed = False  # new TLS connection resumed a remembered session
+        self.total = 0.0
+        for phase in PHASES:
+            setattr(self, phase, 0.0)
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+def default_scenario():
+    return os.path.splitext(os.path.basename(sys.argv[0] or "interactive"))[0]
+
+def tag(endpoint, data, scenario=None):
+    """New record for a request body, pulling transaction_id/message_id out of its context."""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    txn = _TXN_ID.search(data or b"")
+    msg = _MSG_ID.search(data or b"")
+    return TimingRecord(scenario or default_scenario(), endpoint,
+                        txn and txn.group(1).decode('utf-8'), msg and msg.group(1).decode('utf-8'))
+
+def current():
+    return getattr(_local, "record", None)
+
+def timed(record, send):
+    """Run send() with `record` active, then store it; send must return a fully read response."""
+    _local.record = record
+    start = time.perf_counter()
+    try:
+        response = send()
+        record.status = response.status_code
+        return response
+    finally:
+        end = time.perf_counter()
+        record.total = end - start
+        headers_at = getattr(_local, "headers_at", None)
+        if headers_at is not None:
+            record.body = end - headers_at
+        _local.record = None
+        _local.headers_at = None
+        with _records_lock:
+            _records.append(record)
+
+def records():
+    with _records_lock:
+        return list(_records)
+
+def clear():
+    with _records_lock:
+        _records.clear()
+
+def _percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+def summary(selected=None):
+    """{(scenario, endpoint): {"count", "reused", "dns_cached", "resumed", phase: (mean, p50, p95), ...}} in seconds."""
+    groups = {}
+    for record in records() if selected is None else selected:
+        groups.setdefault((record.scenario, record.endpoint), []).append(record)
+    result = {}
+    for key, group in groups.items():
+        stats = {"count": len(group), "reused": sum(record.reused for record in group),
+                 "dns_cached": sum(record.dns_cached for record in group),
+                 "resumed": sum(record.resumed for record in group)}
+        for phase in PHASES + ("total",):
+            values = sorted(getattr(record, phase) for record in group)
+            stats[phase] = (sum(values) / len(values), _percentile(values, 0.5), _percentile(values, 0.95))
+        result[key] = stats
+    return result
+
+def print_summary(selected=None):
+    for (scenario, endpoint), stats in summary(selected).items():
+        print(f"{scenario} {endpoint}: {stats['count']} request(s), {stats['reused']} on reused connections, "
+              f"{stats['dns_cached']} cached DNS lookup(s), {stats['resumed']} resumed TLS session(s)")
+        for phase in PHASES + ("total",):
+            mean, p50, p95 = stats[phase]
+            print(f"  {phase:8} mean {mean * 1000:8.1f} ms  p50 {p50 * 1000:8.1f} ms  p95 {p95 * 1000:8.1f} ms")
+
+# httpcore trace events, less the "http11."/"http2." or "connection." prefix, and the phase they count towards
+_TRACE_PHASES = {"connect_tcp": "connect", "start_tls": "tls", "send_connection_init": "write",
+                 "send_request_headers": "write", "send_request_body": "write", "receive_response_headers": "ttfb"}
+
+def trace(record):
+    """httpx/httpcore trace callback (request extension "trace") that reports into `record`."""
+    started = {}
+
+    def callback(event, info):
+        name, _, stage = event.rpartition(".")
+        now = time.perf_counter()
+        if stage == "started":
+            started[name] = now
+            return
+        phase = _TRACE_PHASES.get(name.partition(".")[2])
+        if phase is None or name not in started:
+            return
+        setattr(record, phase, getattr(record, phase) + now - started.pop(name))
+        if phase == "connect":
+            record.reused = False
+        elif phase == "tls" and stage == "complete":
+            ssl_object = info["return_value"].get_extra_info("ssl_object")
+            record.resumed = bool(ssl_object is not None and ssl_object.session_reused)
+        elif phase == "ttfb":
+            _local.headers_at = now
+
+    return callback
+
+def timed_connection(base):
+    """Subclass of a netcache.cached_connection class that reports into the active TimingRecord."""
+    class TimedConnection(base):
+        def _resolve(self):
+            record = current()
+            start = time.perf_counter()
+            addresses, cached = super()._resolve()
+            if record is not None:
+                record.dns += time.perf_counter() - start
+                record.dns_cached = cached
+            return addresses, cached
+
+        def _new_conn(self):
+            record = current()
+            if record is None:
+                return super()._new_conn()
+            record.reused = False
+            before = record.dns
+            start = time.perf_counter()
+            try:
+                return super()._new_conn()
+            finally:
+                record.connect += (time.perf_counter() - start) - (record.dns - before)
+
+        def connect(self):
+            record = current()
+            if record is None:
+                return super().connect()
+            before = record.dns + record.connect
+            start = time.perf_counter()
+            super().connect()
+            record.tls += (time.perf_counter() - start) - (record.dns + record.connect - before)
+            record.resumed = bool(getattr(self.sock, "session_reused", False))
+
+        def request(self, *args, **kwargs):
+            record = current()
+            if record is None:
+                return super().request(*args, **kwargs)
+            before = record.dns + record.connect + record.tls
+            start = time.perf_counter()
+            super().request(*args, **kwargs)
+            # plain HTTP connects lazily inside request(); keep that out of the write phase
+            record.write += (time.perf_counter() - start) - (record.dns + record.connect + record.tls - before)
+
+        def getresponse(self, *args, **kwargs):
+            record = current()
+            if record is None:
+                return super().getresponse(*args, **kwargs)
+            start = time.perf_counter()
+            response = super().getresponse(*args, **kwargs)
+            _local.headers_at = time.perf_counter()
+            record.ttfb += _local.headers_at - start
+            return response
+
+    TimedConnection.__name__ = "Timed" + base.__name__
+    return TimedConnection
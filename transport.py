@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""Shared HTTP transport for every /settle and /report call.
+
+One pooled requests.Session per host keeps TCP/TLS connections to the gateway
+alive between calls instead of handshaking for each request; new connections
+reuse cached DNS answers and resume the previous TLS session. Http2Transport
+is an optional drop-in that multiplexes requests over one HTTP/2 connection.
+"""
+import atexit
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import netcache
+import timing
+from breaker import Breakers
+from creds import config
+
+log = logging.getLogger(__name__)
+
+class Transport:
+    def __init__(self, pool_size=10, keep_alive=True, warm_up=0, timings=False, verify=True, breakers=None,
+                 dns_ttl=60.0, tls_resume=True):
+        """`breakers` (a breaker.Breakers) makes calls to an endpoint fail fast while its circuit is open."""
+        self.breakers = breakers
+        self.dns_cache = netcache.DnsCache(dns_ttl)
+        self.tls_context = netcache.client_context(verify) if tls_resume else None
+        self.pool_size = pool_size
+        self.keep_alive = keep_alive
+        self.timings = timings
+        self.verify = verify
+        self.warm_up_connections = warm_up
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _new_session(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        adapter.poolmanager.pool_classes_by_scheme = self._pool_classes()
+        if self.tls_context is not None:
+            adapter.poolmanager.connection_pool_kw["ssl_context"] = self.tls_context
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+    def _pool_classes(self):
+        from urllib3.connection import HTTPConnection, HTTPSConnection
+        from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+        classes = {}
+        for scheme, pool, connection in (("http", HTTPConnectionPool, HTTPConnection),
+                                         ("https", HTTPSConnectionPool, HTTPSConnection)):
+            connection = netcache.cached_connection(connection, self.dns_cache)
+            if self.timings:
+                connection = timing.timed_connection(connection)
+            classes[scheme] = type(pool.__name__, (pool,), {"ConnectionCls": connection})
+        return classes
+
+    def session(self, url):
+        host = urlsplit(url).netloc
+        session = self._sessions.get(host)
+        if session is None:
+            with self._lock:  # held through warm-up, so first requests to the host wait for it instead of racing it
+                session = self._sessions.get(host)
+                if session is None:
+                    session = self._new_session()
+                    if self.warm_up_connections:
+                        self._warm_up(session, url, self.warm_up_connections)
+                    self._sessions[host] = session
+        return session
+
+    def warm_up(self, url, connections=1):
+        """Open up to `connections` TCP/TLS connections to url's host with HEAD requests, left in the pool."""
+        self._warm_up(self.session(url), url, connections)
+
+    def _warm_up(self, session, url, connections):
+        connections = min(connections, self.pool_size)
+        # all HEADs leave together, so none finds another's connection idle and reuses it
+        start = threading.Barrier(connections)
+
+        def head(_):
+            try:
+                start.wait(timeout=5)
+            except threading.BrokenBarrierError:
+                pass
+            _head(session, url, verify=self.verify)
+
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            list(executor.map(head, range(connections)))
+
+    def post(self, url, data=None, headers=None, timeout=30, scenario=None, **kwargs):
+        """POST through the pooled session; with timings on, `scenario` tags the record (default: script name)."""
+        session = self.session(url)
+        kwargs.setdefault("verify", self.verify)  # per request, so REQUESTS_CA_BUNDLE cannot override it
+        send = lambda: session.post(url, data=data, headers=headers, timeout=timeout, **kwargs)
+        if self.timings:
+            record = timing.tag(urlsplit(url).path, data, scenario)
+            send = lambda send=send: timing.timed(record, send)
+        if self.breakers is None:
+            return send()
+        return self.breakers.for_url(url).call(send)
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            session.close()
+
+class Http2Transport:
+    """Transport interface over httpx with HTTP/2 (optional `httpx[http2]` dependency).
+
+    Requests to one host share a single multiplexed connection when the server
+    negotiates h2 over ALPN and fall back to pooled HTTP/1.1 otherwise. Timings
+    come from httpx's trace hook (DNS is part of the connect phase) and warm-up
+    sends HEAD requests; dns_ttl and tls_resume are not applied, as httpx does
+    its own lookups and TLS sessions.
+    """
+
+    def __init__(self, pool_size=10, keep_alive=True, warm_up=0, timings=False, verify=True, breakers=None,
+                 dns_ttl=60.0, tls_resume=True):
+        import httpx
+        if dns_ttl != 60.0 or not tls_resume:
+            log.warning("Http2Transport ignores dns_ttl=%s and tls_resume=%s", dns_ttl, tls_resume)
+        self.breakers = breakers
+        self.pool_size = pool_size
+        self.timings = timings
+        self.verify = verify
+        self.warm_up_connections = warm_up
+        self._warmed = set()
+        self._lock = threading.Lock()
+        limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size if keep_alive else 0)
+        self._client = httpx.Client(http2=True, verify=verify, limits=limits)
+
+    def warm_up(self, url, connections=1):
+        """Connect to url's host with HEAD requests, up to `connections` at once (one is enough over h2)."""
+        connections = min(connections, self.pool_size)
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            list(executor.map(lambda _: _head(self._client, url), range(connections)))
+
+    def post(self, url, data=None, headers=None, timeout=30, scenario=None, verify=None, allow_redirects=True,
+             **kwargs):
+        """Transport.post over httpx; `verify` is fixed per client, and other requests options are rejected."""
+        import httpx
+        if kwargs:
+            raise TypeError(f"Http2Transport.post() does not support {', '.join(sorted(kwargs))}")
+        if verify is not None and verify != self.verify:
+            raise ValueError("Http2Transport verifies per client; pass verify= to the constructor instead")
+        if self.warm_up_connections:
+            self._warm_once(url)
+        if isinstance(timeout, tuple):  # requests-style (connect, read)
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        extensions = {}
+        send = lambda: self._client.post(url, content=data, headers=headers, timeout=timeout,
+                                         follow_redirects=allow_redirects, extensions=extensions)
+        if self.timings:
+            record = timing.tag(urlsplit(url).path, data, scenario)
+            extensions["trace"] = timing.trace(record)
+            send = lambda send=send: timing.timed(record, send)
+        if self.breakers is None:
+            return send()
+        return self.breakers.for_url(url).call(send)
+
+    def _warm_once(self, url):
+        host = urlsplit(url).netloc
+        if host in self._warmed:
+            return
+        with self._lock:  # first requests to the host wait for the warm-up instead of racing it
+            if host not in self._warmed:
+                self.warm_up(url, self.warm_up_connections)
+                self._warmed.add(host)
+
+    def close(self):
+        self._client.close()
+
+def network_errors():
+    """Exception types meaning the request never got an HTTP answer, for every available transport."""
+    import requests
+    errors = (requests.ConnectionError, requests.Timeout)
+    try:
+        import httpx
+    except ImportError:
+        return errors
+    return errors + (httpx.TransportError,)
+
+def _head(client, url, **kwargs):
+    try:
+        client.head(url, timeout=30, **kwargs)
+    except Exception:
+        pass  # the first real request reports the failure
+
+def config_breakers():
+    """Breakers configured from BREAKER_FAILURES, BREAKER_RESET and BREAKER_PROBES, or None when disabled."""
+    failures = int(config.BREAKER_FAILURES)
+    if not failures:
+        return None
+    return Breakers(failure_threshold=failures, reset_timeout=float(config.BREAKER_RESET),
+                    probes=int(config.BREAKER_PROBES))
+
+_default = None
+_default_lock = threading.Lock()
+
+def get_transport():
+    """Process-wide transport configured from HTTP2, POOL_SIZE, KEEP_ALIVE, WARM_UP, TIMINGS, BREAKER_*,
+    DNS_TTL and TLS_RESUME."""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                timings = _enabled(config.TIMINGS)
+                transport_class = Http2Transport if _enabled(config.HTTP2) else Transport
+                breakers = config_breakers()
+                _default = transport_class(pool_size=int(config.POOL_SIZE),
+                                           keep_alive=_enabled(config.KEEP_ALIVE),
+                                           warm_up=int(config.WARM_UP),
+                                           timings=timings,
+                                           breakers=breakers,
+                                           dns_ttl=float(config.DNS_TTL),
+                                           tls_resume=_enabled(config.TLS_RESUME))
+                if timings:
+                    atexit.register(timing.print_summary)
+    return _default
+
+def _enabled(value):
+    return value not in ("0", "false", "no", "")
+
+def post(url, data=None, headers=None, timeout=30, scenario=None, **kwargs):
+    return get_transport().post(url, data=data, headers=headers, timeout=timeout, scenario=scenario, **kwargs)